@@ -2,45 +2,63 @@
 # 🧪 ab_testing_coach.py — A/B Testing & Prediction Coach
 # ============================================================
 
+import os
 import random
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from generate_content import generate_marketing_content
 from optimize_content import optimize_content
-from sentiment_analysis import analyze_sentiment
+from sentiment_analysis import analyze_sentiment_batch
 from trend_analysis import fetch_trending_topics
 from performance_metrics import generate_performance_metrics
 from google_sheets_example import update_sheet
 from slack_notify import send_slack_alert
+from checkpoint_store import get_checkpoint_store
 
 # ============================================================
 # 🔹 A/B Test Variant Generator
 # ============================================================
 
-def generate_ab_variants(topic, platform="twitter", num_variants=2):
+def generate_ab_variants(topic, platform="twitter", num_variants=2, max_in_flight=None):
     """
     Generate multiple content variants for A/B testing.
+    All LLM calls are issued at once on a bounded thread pool
+    (max_in_flight, default $AB_MAX_IN_FLIGHT or 5), then the finished
+    texts are scored in one batched sentiment pass.
     Returns a list of variant dictionaries with content and metadata.
     """
-    variants = []
     tones = ["engaging", "professional", "casual", "urgent", "inspirational"]
+    # Every tone is used once before any repeats
+    tone_order = random.sample(tones, len(tones))
+    max_in_flight = max_in_flight or int(os.getenv("AB_MAX_IN_FLIGHT", "5"))
     
     print(f"🧪 Generating {num_variants} A/B test variants for '{topic}'...")
     
-    for i in range(num_variants):
-        tone = random.choice(tones)
-        content = generate_marketing_content(topic, platform, tone)
-        sentiment = analyze_sentiment(content)
-        
-        variant = {
+    variants = [
+        {
             "variant_id": f"V{i+1}",
-            "tone": tone,
-            "content": content,
-            "sentiment": sentiment,
+            "tone": tone_order[i % len(tones)],
+            "content": None,
             "platform": platform
         }
-        variants.append(variant)
-        print(f"✅ Variant {i+1} ({tone}): Generated")
+        for i in range(num_variants)
+    ]
+    
+    with ThreadPoolExecutor(max_workers=min(max_in_flight, num_variants) or 1) as pool:
+        futures = {
+            # The variant id keeps same-tone variants from sharing one cached completion
+            pool.submit(generate_marketing_content, topic, platform, v["tone"], v["variant_id"]): v
+            for v in variants
+        }
+        for future in as_completed(futures):
+            variant = futures[future]
+            variant["content"] = future.result()
+            print(f"✅ Variant {variant['variant_id'][1:]} ({variant['tone']}): Generated")
+    
+    # Score every variant in one batched sentiment pass
+    sentiments = analyze_sentiment_batch([v["content"] for v in variants])
+    for variant, result in zip(variants, sentiments):
+        variant["sentiment"] = result["sentiment"]
     
     return variants
 
@@ -49,44 +67,16 @@ def generate_ab_variants(topic, platform="twitter", num_variants=2):
 # 🔹 Campaign Simulation Engine
 # ============================================================
 
-def simulate_campaign_performance(variant, days=7):
+def simulate_campaign_performance(variant, days=7, seed=None):
     """
     Simulate campaign performance over time with realistic patterns.
     Returns daily metrics and predictions.
+    Thin adapter over the vectorized engine in campaign_simulator.
     """
-    base_views = random.randint(1000, 3000)
-    base_engagement = random.uniform(0.05, 0.15)  # 5-15% engagement rate
-    
-    # Sentiment boost
-    sentiment_multiplier = {
-        "Positive": 1.3,
-        "Neutral": 1.0,
-        "Negative": 0.7
-    }
-    multiplier = sentiment_multiplier.get(variant["sentiment"], 1.0)
-    
-    daily_data = []
-    for day in range(days):
-        # Simulate decay and viral patterns
-        decay_factor = 0.85 ** day  # Natural decay
-        viral_chance = random.random()
-        viral_boost = 2.5 if viral_chance > 0.9 else 1.0
-        
-        views = int(base_views * multiplier * decay_factor * viral_boost)
-        likes = int(views * base_engagement * random.uniform(0.8, 1.2))
-        shares = int(likes * random.uniform(0.2, 0.4))
-        comments = int(likes * random.uniform(0.1, 0.3))
-        
-        daily_data.append({
-            "day": day + 1,
-            "views": views,
-            "likes": likes,
-            "shares": shares,
-            "comments": comments,
-            "engagement_rate": round((likes + shares + comments) / views * 100, 2)
-        })
-    
-    return daily_data
+    from campaign_simulator import simulate_campaigns, sentiment_multipliers, daily_records
+
+    daily = simulate_campaigns(sentiment_multipliers([variant]), days=days, seed=seed)
+    return daily_records(daily[0, 0])
 
 
 # ============================================================
@@ -141,6 +131,79 @@ def predict_winner(variants_with_results):
     return recommendation
 
 
+def predict_winner_monte_carlo(variants, simulation_days=7, replicates=5000,
+                               win_threshold=0.95, workers=None, seed=None):
+    """
+    Predict the winner from thousands of replicate simulations per variant.
+    Reports each variant's win probability with 95% intervals on composite
+    score and engagement rate; stops early once the leader's win probability
+    passes win_threshold.
+    """
+    from campaign_simulator import monte_carlo, sentiment_multipliers
+    import numpy as np
+
+    print(f"\n🔮 Running up to {replicates:,} Monte Carlo replicates per variant...")
+    
+    result = monte_carlo(
+        sentiment_multipliers(variants), days=simulation_days, replicates=replicates,
+        win_threshold=win_threshold, workers=workers, seed=seed
+    )
+    
+    predictions = []
+    for i, variant in enumerate(variants):
+        composite = result["composite"][i]
+        engagement_rate = result["engagement_rate"][i]
+        predictions.append({
+            "variant_id": variant["variant_id"],
+            "tone": variant["tone"],
+            "sentiment": variant["sentiment"],
+            "win_probability": round(float(result["win_probability"][i]), 4),
+            "composite_score": round(float(composite.mean()), 1),
+            "composite_interval": [round(float(x), 1) for x in np.percentile(composite, [2.5, 97.5])],
+            "engagement_rate": round(float(engagement_rate.mean()), 2),
+            "engagement_rate_interval": [round(float(x), 2) for x in np.percentile(engagement_rate, [2.5, 97.5])],
+            "total_views": int(result["views"][i].mean())
+        })
+    
+    # Rank by how often each variant wins, then by mean score
+    predictions.sort(key=lambda x: (x["win_probability"], x["composite_score"]), reverse=True)
+    winner = predictions[0]
+    
+    print(f"✅ {result['replicates']:,} replicates"
+          f"{' (stopped early)' if result['early_stopped'] else ''}: "
+          f"{winner['variant_id']} wins {winner['win_probability']:.0%} of runs")
+    
+    return {
+        "winner": winner,
+        "confidence": round(winner["win_probability"] * 100, 1),
+        "all_variants": predictions,
+        "insights": generate_insights(predictions),
+        "replicates": result["replicates"],
+        "early_stopped": result["early_stopped"]
+    }
+
+
+def monte_carlo_results(variants, recommendation):
+    """
+    Monte Carlo means in the variants_with_results shape, so the logged rows
+    are the ones the winner was picked from. The replicates only track views
+    and engagement rate, so likes and shares are left blank.
+    """
+    by_id = {p["variant_id"]: p for p in recommendation["all_variants"]}
+    return [
+        {
+            "variant": variant,
+            "total_metrics": {
+                "views": by_id[variant["variant_id"]]["total_views"],
+                "likes": "",
+                "shares": "",
+                "engagement_rate": by_id[variant["variant_id"]]["engagement_rate"]
+            }
+        }
+        for variant in variants
+    ]
+
+
 # ============================================================
 # 🔹 Insight Generator
 # ============================================================
@@ -172,43 +235,75 @@ def generate_insights(predictions):
 # 🔹 Run Complete A/B Test
 # ============================================================
 
-def run_ab_test(topic, platform="twitter", num_variants=3, simulation_days=7):
+def run_ab_test(topic, platform="twitter", num_variants=3, simulation_days=7, seed=None,
+                monte_carlo=False):
     """
     Complete A/B testing pipeline with predictions and recommendations.
+    Pass a seed to make the campaign simulation reproducible.
+    With monte_carlo=True the winner comes from replicate simulations
+    (win probability + intervals) instead of a single simulated run.
+    Finished steps are checkpointed, so a rerun with the same arguments
+    after a failure skips the work that already completed (the Sheets and
+    Slack writes always run again).
     """
+    from campaign_simulator import (
+        simulate_campaigns, summarize, sentiment_multipliers, daily_records, total_record
+    )
+
     print(f"\n{'='*60}")
     print(f"🚀 Starting A/B Test Campaign for: {topic}")
     print(f"{'='*60}\n")
     
+    store = get_checkpoint_store()
+    run_key = store.claim(f"ab:{topic}|{platform}|{num_variants}|{simulation_days}|{seed}|{monte_carlo}")
+    try:
+        recommendation = _run_ab_steps(topic, platform, num_variants, simulation_days, seed,
+                                       monte_carlo, store, run_key)
+    finally:
+        store.release(run_key)
+    
+    print(f"\n✅ A/B Test completed successfully!\n")
+    return recommendation
+
+
+def _run_ab_steps(topic, platform, num_variants, simulation_days, seed, monte_carlo, store, run_key):
+    """Steps of run_ab_test under an already claimed checkpoint key; returns the recommendation."""
+    done = store.load(run_key)
+    
     # Step 1: Generate variants
-    variants = generate_ab_variants(topic, platform, num_variants)
+    variants = store.step(run_key, "variants",
+                          lambda: generate_ab_variants(topic, platform, num_variants), done)
     
     # Step 2: Simulate campaign performance
-    print(f"\n📊 Simulating {simulation_days}-day campaign performance...")
-    variants_with_results = []
-    
-    for variant in variants:
-        daily_metrics = simulate_campaign_performance(variant, simulation_days)
+    def simulate():
+        print(f"\n📊 Simulating {simulation_days}-day campaign performance...")
+        variants_with_results = []
         
-        # Calculate totals
-        total_metrics = {
-            "views": sum(d["views"] for d in daily_metrics),
-            "likes": sum(d["likes"] for d in daily_metrics),
-            "shares": sum(d["shares"] for d in daily_metrics),
-            "comments": sum(d["comments"] for d in daily_metrics),
-            "engagement_rate": round(sum(d["engagement_rate"] for d in daily_metrics) / len(daily_metrics), 2)
-        }
-        
-        variants_with_results.append({
-            "variant": variant,
-            "daily_metrics": daily_metrics,
-            "total_metrics": total_metrics
-        })
+        # All variants in one vectorized run, then totals over the day axis
+        daily = simulate_campaigns(sentiment_multipliers(variants), days=simulation_days, seed=seed)
+        totals = summarize(daily)
         
-        print(f"✅ {variant['variant_id']} ({variant['tone']}): {total_metrics['views']:,} views, {total_metrics['engagement_rate']}% engagement")
+        for i, variant in enumerate(variants):
+            total_metrics = total_record(totals[i, 0])
+            
+            variants_with_results.append({
+                "variant": variant,
+                "daily_metrics": daily_records(daily[i, 0]),
+                "total_metrics": total_metrics
+            })
+            
+            print(f"✅ {variant['variant_id']} ({variant['tone']}): {total_metrics['views']:,} views, {total_metrics['engagement_rate']}% engagement")
+        return variants_with_results
+    
+    variants_with_results = store.step(run_key, "results", simulate, done)
     
     # Step 3: Predict winner and generate recommendations
-    recommendation = predict_winner(variants_with_results)
+    def recommend():
+        if monte_carlo:
+            return predict_winner_monte_carlo(variants, simulation_days, seed=seed)
+        return predict_winner(variants_with_results)
+    
+    recommendation = store.step(run_key, "recommendation", recommend, done)
     
     # Step 4: Display results
     print(f"\n{'='*60}")
@@ -222,15 +317,19 @@ def run_ab_test(topic, platform="twitter", num_variants=3, simulation_days=7):
     for insight in recommendation['insights']:
         print(f"   {insight}")
     
-    # Step 5: Log to Google Sheets
+    # Sheets and Slack writes are only queued when these return, so they are
+    # not checkpointed: a resumed run repeats them instead of skipping them
+    
+    # Step 5: Log to Google Sheets (the results the winner was picked from)
     print(f"\n🗂️ Logging results to Google Sheets...")
-    log_ab_test_results(topic, variants_with_results, recommendation)
+    logged = monte_carlo_results(variants, recommendation) if monte_carlo else variants_with_results
+    log_ab_test_results(topic, logged, recommendation)
     
     # Step 6: Send Slack notification
     print(f"\n💬 Sending Slack notification...")
     send_ab_test_alert(topic, recommendation)
     
-    print(f"\n✅ A/B Test completed successfully!\n")
+    store.clear(run_key)
     return recommendation
 
 
@@ -241,9 +340,7 @@ def run_ab_test(topic, platform="twitter", num_variants=3, simulation_days=7):
 def log_ab_test_results(topic, variants_with_results, recommendation):
     """Log A/B test results to Google Sheets."""
     try:
-        from google_sheets_example import ensure_tab_exists
-        
-        # Ensure AB_Testing tab exists with proper headers
+        # AB_Testing tab headers (the tab is created on first flush if missing)
         headers = [
             "Timestamp",
             "Topic",
@@ -256,7 +353,6 @@ def log_ab_test_results(topic, variants_with_results, recommendation):
             "Engagement Rate",
             "Winner"
         ]
-        ensure_tab_exists("AB_Testing", headers)
         
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         winner = recommendation['winner']
@@ -278,9 +374,10 @@ def log_ab_test_results(topic, variants_with_results, recommendation):
                 metrics['engagement_rate'],
                 is_winner
             ]
-            update_sheet("AB_Testing", row)
+            update_sheet("AB_Testing", row, headers)
         
-        print("✅ Results logged to Google Sheets")
+        # Rows are buffered by the write-behind queue and sent in one append call
+        print("✅ Results queued for Google Sheets")
     except Exception as e:
         print(f"⚠️ Could not log to Google Sheets: {e}")
 
@@ -304,7 +401,7 @@ def send_ab_test_alert(topic, recommendation):
 💡 *Key Insights:*
 {chr(10).join(recommendation['insights'])}
         """
-        send_slack_alert(message)
+        send_slack_alert(message, topic=topic)
         print("✅ Slack notification sent")
     except Exception as e:
         print(f"⚠️ Could not send Slack alert: {e}")
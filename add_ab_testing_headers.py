@@ -3,8 +3,6 @@
 # ============================================================
 
 import os
-from googleapiclient.discovery import build
-from google.oauth2 import service_account
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -13,11 +11,6 @@ load_dotenv()
 SHEET_ID = os.getenv("GOOGLE_SHEET_ID")
 CRED_PATH = os.getenv("GOOGLE_SHEETS_CREDENTIALS", "credentials.json")
 
-# Authenticate
-SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
-creds = service_account.Credentials.from_service_account_file(CRED_PATH, scopes=SCOPES)
-service = build("sheets", "v4", credentials=creds)
-
 # Define the headers for AB_Testing tab
 headers = [
     "Timestamp",
@@ -32,23 +25,35 @@ headers = [
     "Winner"
 ]
 
-# Clear and add headers to AB_Testing tab
-try:
-    # Clear the first row
-    service.spreadsheets().values().clear(
-        spreadsheetId=SHEET_ID,
-        range="AB_Testing!A1:J1"
-    ).execute()
-    
-    # Add headers
-    service.spreadsheets().values().update(
-        spreadsheetId=SHEET_ID,
-        range="AB_Testing!A1",
-        valueInputOption="RAW",
-        body={"values": [headers]}
-    ).execute()
-    
-    print("✅ AB_Testing tab headers added successfully!")
-    print(f"Headers: {headers}")
-except Exception as e:
-    print(f"❌ Error: {e}")
+
+def add_ab_testing_headers():
+    """Clear and rewrite the header row of the AB_Testing tab."""
+    # Authenticate (live API or local emulator, per $SHEETS_BACKEND)
+    from sheets_backend import get_sheets_service
+
+    service = get_sheets_service(CRED_PATH)
+
+    # Clear and add headers to AB_Testing tab
+    try:
+        # Clear the first row
+        service.spreadsheets().values().clear(
+            spreadsheetId=SHEET_ID,
+            range="AB_Testing!A1:J1"
+        ).execute()
+        
+        # Add headers
+        service.spreadsheets().values().update(
+            spreadsheetId=SHEET_ID,
+            range="AB_Testing!A1",
+            valueInputOption="RAW",
+            body={"values": [headers]}
+        ).execute()
+        
+        print("✅ AB_Testing tab headers added successfully!")
+        print(f"Headers: {headers}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
+
+if __name__ == "__main__":
+    add_ab_testing_headers()
@@ -1,10 +1,20 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
 from ab_testing_coach import run_ab_test
-from prediction_coach import run_prediction_coach
+from prediction_coach import run_prediction_coach, predict_content_performance_batch, generate_recommendations
+from generate_content import stream_marketing_content
+from optimize_content import stream_optimized_content
+from job_queue import get_job_queue, QueueFull
+import gc
+import os
 import json
 
 app = Flask(__name__)
 
+# Long-running pipelines run as background jobs; request handlers only enqueue
+jobs = get_job_queue()
+jobs.register("ab_test", lambda p: run_ab_test(p["topic"], num_variants=p["variants"], monte_carlo=p["monte_carlo"]))
+jobs.register("predict", lambda p: run_prediction_coach(p["topic"]))
+
 @app.route('/')
 def home():
     return '''
@@ -13,6 +23,7 @@ def home():
     <form action="/ab_test" method="post">
         <input type="text" name="topic" placeholder="Campaign topic" required>
         <input type="number" name="variants" value="3" min="2" max="5">
+        <label><input type="checkbox" name="monte_carlo"> Monte Carlo confidence</label>
         <button type="submit">Run A/B Test</button>
     </form>
     
@@ -21,28 +32,284 @@ def home():
         <input type="text" name="topic" placeholder="Content topic" required>
         <button type="submit">Get Predictions</button>
     </form>
+    
+    <h2>Live Content Generation</h2>
+    <form id="stream-form">
+        <input type="text" name="topic" placeholder="Content topic" required>
+        <button type="submit">Generate</button>
+    </form>
+    <pre id="stream-output"></pre>
+    <script>
+    document.getElementById('stream-form').onsubmit = function (e) {
+        e.preventDefault();
+        var out = document.getElementById('stream-output');
+        out.textContent = '';
+        var source = new EventSource('/stream/generate?topic=' + encodeURIComponent(this.topic.value));
+        source.onmessage = function (m) { out.textContent += JSON.parse(m.data); };
+        source.addEventListener('done', function () { source.close(); });
+        source.addEventListener('error', function (e) {
+            source.close();
+            // Server-sent "event: error" carries the message; a dropped connection has no data
+            out.textContent += '\n❌ ' + (e.data ? JSON.parse(e.data) : 'Connection lost');
+        });
+    };
+    </script>
     '''
 
+def sse_response(chunks):
+    """Wrap a text generator as a Server-Sent Events stream (one JSON string per event)."""
+    def events():
+        try:
+            for chunk in chunks:
+                yield f"data: {json.dumps(chunk)}\n\n"
+            yield "event: done\ndata: {}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps(str(e))}\n\n"
+
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/stream/generate')
+def stream_generate():
+    topic = request.args['topic']
+    platform = request.args.get('platform', 'twitter')
+    tone = request.args.get('tone', 'engaging')
+    return sse_response(stream_marketing_content(topic, platform, tone))
+
+@app.route('/stream/optimize')
+def stream_optimize():
+    content = request.args['content']
+    trends = [t.strip() for t in request.args.get('trends', '').split(',') if t.strip()]
+    return sse_response(stream_optimized_content(content, trends))
+
+def submit_job(kind, params, title):
+    """
+    Queue a job and answer 202 right away: JSON for API clients, otherwise
+    a page that polls /jobs/<id> until the result is ready. 429 when the queue is full.
+    """
+    try:
+        job_id = jobs.submit(kind, params)
+    except QueueFull as e:
+        return jsonify({"error": f"Job queue is full, try again later ({e})"}), 429, {'Retry-After': '30'}
+
+    status_url = f"/jobs/{job_id}"
+    if request.is_json or request.accept_mimetypes.best == 'application/json':
+        return jsonify({"job_id": job_id, "status_url": status_url}), 202, {'Location': status_url}
+
+    return f'''
+    <h2>{title}</h2>
+    <p id="status">⏳ Job {job_id} queued...</p>
+    <pre id="result"></pre>
+    <script>
+    (function poll() {{
+        fetch('{status_url}').then(function (r) {{ return r.json(); }}).then(function (job) {{
+            document.getElementById('status').textContent = '⏳ Job {job_id}: ' + job.status;
+            if (job.status === 'done') {{
+                document.getElementById('status').textContent = '✅ Done in ' + job.seconds + 's';
+                document.getElementById('result').textContent = JSON.stringify(job.result, null, 2);
+            }} else if (job.status === 'failed') {{
+                document.getElementById('status').textContent = 'Error: ' + job.error;
+            }} else {{
+                setTimeout(poll, 2000);
+            }}
+        }});
+    }})();
+    </script>
+    ''', 202, {'Location': status_url}
+
+def form_or_json():
+    data = request.get_json(silent=True)
+    if data is None:
+        return request.form
+    if not isinstance(data, dict):
+        raise InvalidParams("Expected a JSON object")
+    return data
+
+MIN_VARIANTS, MAX_VARIANTS = 2, 5
+TRUE_VALUES = {"1", "true", "yes", "on"}
+FALSE_VALUES = {"", "0", "false", "no", "off"}
+
+class InvalidParams(ValueError):
+    """A job request with missing or malformed fields (answered with 400)."""
+
+def parse_topic(data):
+    topic = data.get('topic')
+    if not isinstance(topic, str) or not topic.strip():
+        raise InvalidParams("'topic' is required and must be a non-empty string")
+    return topic.strip()
+
+def parse_variants(data):
+    value = data.get('variants', 3)
+    # bool is an int subclass; reject it along with floats like 2.5
+    if isinstance(value, bool) or isinstance(value, float):
+        value = None
+    try:
+        variants = int(value)
+    except (TypeError, ValueError):
+        raise InvalidParams(f"'variants' must be an integer from {MIN_VARIANTS} to {MAX_VARIANTS}")
+    if not MIN_VARIANTS <= variants <= MAX_VARIANTS:
+        raise InvalidParams(f"'variants' must be an integer from {MIN_VARIANTS} to {MAX_VARIANTS}")
+    return variants
+
+def parse_flag(data, name):
+    """JSON booleans, or form/string values like "on", "true", "false", "0"."""
+    value = data.get(name, False)
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in TRUE_VALUES | FALSE_VALUES:
+        return value.strip().lower() in TRUE_VALUES
+    raise InvalidParams(f"'{name}' must be a boolean")
+
+@app.errorhandler(InvalidParams)
+def invalid_params(e):
+    return jsonify({"error": str(e)}), 400
+
 @app.route('/ab_test', methods=['POST'])
 def ab_test():
-    topic = request.form['topic']
-    variants = int(request.form.get('variants', 3))
-    
-    try:
-        result = run_ab_test(topic, num_variants=variants)
-        return f"<h2>A/B Test Results</h2><pre>{json.dumps(result, indent=2)}</pre>"
-    except Exception as e:
-        return f"Error: {str(e)}"
+    data = form_or_json()
+    params = {
+        "topic": parse_topic(data),
+        "variants": parse_variants(data),
+        "monte_carlo": parse_flag(data, 'monte_carlo')
+    }
+    return submit_job("ab_test", params, "A/B Test Results")
 
 @app.route('/predict', methods=['POST'])
 def predict():
-    topic = request.form['topic']
-    
+    return submit_job("predict", {"topic": parse_topic(form_or_json())}, "Prediction Results")
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job id"}), 404
+    return jsonify(job)
+
+# ============================================================
+# 🔹 Bulk scoring API
+# ============================================================
+
+# Items are scored this many at a time, so sentiment runs in batches and
+# the first results stream back before the whole request has been read
+PREDICT_CHUNK_SIZE = int(os.getenv("PREDICT_CHUNK_SIZE", "256"))
+NDJSON_TYPES = ('application/x-ndjson', 'application/jsonl', 'application/ndjson')
+
+class BatchInputError(Exception):
+    """The request body could not be decoded into batch items."""
+
+def read_batch_items():
+    """Yield decoded items from a JSON array body or, line by line, from an NDJSON body."""
+    if request.mimetype in NDJSON_TYPES:
+        for number, line in enumerate(request.stream, 1):
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except ValueError as e:   # JSONDecodeError / UnicodeDecodeError
+                    raise BatchInputError(f"line {number}: {e}")
+    else:
+        data = request.get_json(force=True, silent=True)
+        if data is None:
+            raise BatchInputError("Body is not valid JSON")
+        if not isinstance(data, list):
+            raise BatchInputError("Expected a JSON array of contents")
+        yield from data
+
+def score_chunk(chunk, default_platform):
+    """Predict + recommend for (index, item) pairs; one NDJSON-ready dict per item, in order."""
+    rows, by_platform = {}, {}
+    for index, item in chunk:
+        if isinstance(item, str):
+            item = {"content": item}
+        if not isinstance(item, dict) or not isinstance(item.get("content"), str):
+            rows[index] = {"index": index, "error": "Each item must be a string or an object with a 'content' string"}
+            continue
+        platform = item.get("platform", default_platform)
+        if not isinstance(platform, str):
+            rows[index] = {"index": index, "error": "'platform' must be a string"}
+            continue
+        by_platform.setdefault(platform, []).append((index, item))
+
+    for platform, items in by_platform.items():
+        predictions = predict_content_performance_batch([item["content"] for _, item in items], platform)
+        for (index, item), prediction in zip(items, predictions):
+            row = {"index": index}
+            if "id" in item:
+                row["id"] = item["id"]
+            row["platform"] = platform
+            row["prediction"] = prediction
+            row["recommendations"] = generate_recommendations(item["content"], prediction)
+            rows[index] = row
+
+    return [rows[index] for index, _ in chunk]
+
+@app.route('/api/v1/predict/batch', methods=['POST'])
+def predict_batch():
+    """
+    Score many contents in one call. Body: a JSON array or NDJSON lines, each
+    either a string or {"content": ..., "platform": ..., "id": ...}.
+    Streams back one NDJSON line per item, in input order.
+    """
+    platform = request.args.get('platform', 'twitter')
+
+    def results():
+        chunk = []
+        try:
+            for index, item in enumerate(read_batch_items()):
+                chunk.append((index, item))
+                if len(chunk) >= PREDICT_CHUNK_SIZE:
+                    for row in score_chunk(chunk, platform):
+                        yield json.dumps(row) + "\n"
+                    chunk = []
+            for row in score_chunk(chunk, platform):
+                yield json.dumps(row) + "\n"
+        except BatchInputError as e:
+            # Headers are already sent, so a bad body is reported in-band
+            yield json.dumps({"error": f"Invalid batch input: {e}"}) + "\n"
+        except Exception:
+            app.logger.exception("Batch prediction failed")
+            yield json.dumps({"error": "Internal error while scoring the batch"}) + "\n"
+
+    return Response(stream_with_context(results()), mimetype='application/x-ndjson')
+
+def warm_up():
+    """
+    Load the read-only, fork-safe state every request needs: the sentiment
+    model, the engagement model (if trained; see engagement_model.py) and
+    the Groq client. Sheets (httplib2) and the SQLite caches are not
+    safe to share across a fork, so they stay lazy and open per worker.
+    """
+    from sentiment_analysis import warm_up_sentiment
+    warm_up_sentiment()
+
     try:
-        result = run_prediction_coach(topic)
-        return f"<h2>Prediction Results</h2><pre>{json.dumps(result, indent=2)}</pre>"
+        from engagement_model import load_engagement_model
+        load_engagement_model()
+        print("🔥 Engagement model ready.")
     except Exception as e:
-        return f"Error: {str(e)}"
+        print(f"⚠️ Engagement model warm-up skipped: {e}")
+
+    if os.getenv("GROQ_API_KEY"):
+        from groq_client import get_client
+        get_client()
+        print("🔥 Groq client ready.")
+
+    # Move everything loaded so far out of the GC's reach; collections in the
+    # workers then don't touch (and un-share) these pages
+    gc.collect()
+    gc.freeze()
+
+def create_app(warm=True):
+    """
+    App factory for gunicorn (`wsgi_app = "app:create_app()"`). With
+    preload_app the warm-up runs once in the master, before workers fork.
+    """
+    if warm:
+        warm_up()
+    return app
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,68 @@
+# ============================================================
+# ⏱️ benchmark_content_features.py — Vectorized vs Per-string Features
+# Checks that content_features.extract_features matches the per-string
+# feature code of predict_content_performance on every sample post, then
+# times feature extraction + bulk scoring over N posts (tiled from the CSVs).
+# Sentiment labels are fixed here so only the feature/scoring path is timed.
+# Usage:
+#   python benchmark_content_features.py --rows 100000
+# ============================================================
+
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+from content_features import extract_features, score_features
+
+CTA_KEYWORDS = ["click", "learn", "discover", "join", "get", "try", "download"]
+
+
+def scalar_features(content):
+    """The original per-string scans from predict_content_performance."""
+    return (
+        len(content.split()),
+        content.count("#"),
+        any(char for char in content if ord(char) > 127),
+        any(keyword in content.lower() for keyword in CTA_KEYWORDS),
+    )
+
+
+def load_texts():
+    tweets = pd.read_csv("sample_data.csv", usecols=["text"])["text"]
+    titles = pd.read_csv("reddit_data.csv", usecols=["title"])["title"]
+    return pd.concat([tweets, titles], ignore_index=True).fillna("").astype(str)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark vectorized content feature extraction")
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    texts = load_texts()
+
+    # Parity: every sample text must produce identical features
+    vectorized = extract_features(texts)
+    expected = pd.DataFrame([scalar_features(t) for t in texts], columns=vectorized.columns)
+    mismatches = int((vectorized.reset_index(drop=True) != expected).any(axis=1).sum())
+    print(f"🧪 Parity on {len(texts)} sample posts: {mismatches} mismatch(es)")
+
+    corpus = pd.Series(np.resize(texts.to_numpy(), args.rows), dtype=object)
+    sentiments = np.resize(np.array(["Positive", "Neutral", "Negative"]), args.rows)
+
+    start = time.perf_counter()
+    for text in corpus:
+        scalar_features(text)
+    scalar_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    predictions = score_features(extract_features(corpus), sentiments, seed=0)
+    bulk_s = time.perf_counter() - start
+
+    print(f"🐢 Per-string features:          {scalar_s:6.2f}s for {args.rows:,} posts")
+    print(f"⚡ Vectorized features + scoring: {bulk_s:6.2f}s for {args.rows:,} posts "
+          f"({args.rows / bulk_s:,.0f} posts/s)")
+    print(f"📊 Mean predicted views: {predictions['predicted_views'].mean():,.0f}")
+
+    if mismatches:
+        raise SystemExit(1)
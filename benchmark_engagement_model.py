@@ -0,0 +1,65 @@
+# ============================================================
+# ⏱️ benchmark_engagement_model.py — Held-out Error vs Baselines
+# Repeated k-fold CV of the engagement model on the historical CSVs,
+# with alpha chosen inside each training fold (nested, so the held-out
+# rows never influence the fit). Compares against:
+#   - global mean   → one mean for every post
+#   - platform mean → per-platform mean (the bar the text features must clear)
+# Exits 1 unless the model beats both baselines on held-out RMSE.
+# Usage:
+#   python benchmark_engagement_model.py --repeats 5
+# ============================================================
+
+import argparse
+import numpy as np
+
+from engagement_model import (
+    load_training_data, featurize, fit_model, platform_means, choose_alpha, CV_FOLDS, HASH_BUCKETS
+)
+
+
+def nested_cv(X, y, platforms, folds=CV_FOLDS, repeats=5):
+    platforms = np.asarray(platforms)
+    errors = {"model": [], "platform_mean": [], "global_mean": []}
+    alphas = []
+    for repeat in range(repeats):
+        order = np.random.default_rng(1000 + repeat).permutation(len(y))
+        for test in np.array_split(order, folds):
+            train = np.setdiff1d(np.arange(len(y)), test)
+            alpha = choose_alpha(X[train], y[train], platforms[train])
+            alphas.append(alpha)
+            means, overall = platform_means(y[train], platforms[train])
+            errors["model"].append(X[test] @ fit_model(X[train], y[train], platforms[train], alpha) - y[test])
+            errors["platform_mean"].append(np.array([means.get(p, overall) for p in platforms[test]]) - y[test])
+            errors["global_mean"].append(np.full(len(test), overall) - y[test])
+    report = {}
+    for name, parts in errors.items():
+        e = np.concatenate(parts)
+        report[name] = {"mae": float(np.abs(e).mean()), "rmse": float(np.sqrt((e ** 2).mean()))}
+    return report, alphas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cross-validate the engagement model against baselines")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    texts, platforms, engagement = load_training_data()
+    X = featurize(texts, platforms)
+    y = np.log1p(engagement)
+
+    print(f"🧪 {len(y)} posts, {X.shape[1]} features ({HASH_BUCKETS} hash buckets), "
+          f"{args.repeats}x{CV_FOLDS}-fold nested CV (log1p scale)")
+    report, alphas = nested_cv(X, y, platforms, repeats=args.repeats)
+    for name, r in report.items():
+        print(f"   {name:<14} MAE {r['mae']:.4f}   RMSE {r['rmse']:.4f}")
+    print(f"   alphas chosen: {sorted(set(alphas))}")
+
+    model, platform, overall = report["model"], report["platform_mean"], report["global_mean"]
+    gain = 1 - model["rmse"] / platform["rmse"]
+    print(f"📊 RMSE vs platform mean: {gain:+.1%}   vs global mean: {1 - model['rmse'] / overall['rmse']:+.1%}")
+
+    if model["rmse"] >= platform["rmse"] or model["rmse"] >= overall["rmse"]:
+        print("❌ Engagement model does not beat the baselines.")
+        raise SystemExit(1)
+    print("✅ Engagement model beats the baselines.")
@@ -0,0 +1,113 @@
+# ============================================================
+# ⏱️ benchmark_import_time.py — Import-time Budget Guard
+# Runs `python -X importtime -c "import <module>"` for each pipeline module
+# in a fresh interpreter (median of --runs) and fails if any module does
+# not import or its cumulative import time exceeds the budget. Heavy
+# clients and models must load on first use, not import.
+# Usage:
+#   python benchmark_import_time.py --budget-ms 150 --runs 5
+# ============================================================
+
+import os
+import re
+import sys
+import argparse
+import subprocess
+
+MODULES = [
+    "app",
+    "ab_testing_coach",
+    "prediction_coach",
+    "main_content_engine",
+    "sentiment_analysis",
+    "generate_content",
+    "optimize_content",
+    "google_sheets_example",
+    "performance_metrics",
+    "slack_notify",
+    "trend_analysis",
+    "collect_reddit",
+    "collect_youtube",
+    "add_ab_testing_headers",
+]
+
+# Flask alone costs ~150-200 ms to import, so the web app gets its own allowance
+BUDGET_OVERRIDES_MS = {"app": 350}
+
+# "import time:   self [us] | cumulative | imported package"
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure_import(module):
+    """
+    Import a module in a clean interpreter.
+    Returns (cumulative_ms, heaviest) where heaviest lists the slowest
+    top-level dependencies as (name, ms) pairs.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    rows = [m.groups() for m in map(LINE.match, result.stderr.splitlines()) if m]
+    total_us = None
+    children = []
+    for index, (_, cumulative, indent, name) in enumerate(rows):
+        if name == module and len(indent) == 1:
+            total_us = int(cumulative)
+            # Children are printed before their parent; walk back to the previous top-level import
+            for _, child_cumulative, child_indent, child_name in reversed(rows[:index]):
+                if len(child_indent) == 1:
+                    break
+                if len(child_indent) == 3:
+                    children.append((child_name, int(child_cumulative) / 1000))
+            break
+
+    heaviest = sorted(children, key=lambda c: c[1], reverse=True)[:3]
+    return (total_us or 0) / 1000, heaviest
+
+
+def median_import(module, runs):
+    """measure_import repeated `runs` times; the median run (and its heaviest deps)."""
+    samples = sorted((measure_import(module) for _ in range(runs)), key=lambda s: s[0])
+    return samples[len(samples) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time budget guard")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", "150")))
+    parser.add_argument("--runs", type=int, default=5, help="imports per module; the median counts")
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    args = parser.parse_args()
+
+    over_budget, failed = [], []
+    for module in args.modules:
+        try:
+            ms, heaviest = median_import(module, args.runs)
+        except RuntimeError as e:
+            print(f"❌ {module}: import failed ({e})")
+            failed.append(module)
+            continue
+
+        budget = max(args.budget_ms, BUDGET_OVERRIDES_MS.get(module, 0))
+        status = "✅" if ms <= budget else "❌"
+        detail = ", ".join(f"{name} {dep_ms:.0f}ms" for name, dep_ms in heaviest)
+        print(f"{status} {module:<24} {ms:8.1f} ms   [{detail}]")
+        if ms > budget:
+            over_budget.append(module)
+
+    if failed:
+        print(f"\n❌ Failed to import: {', '.join(failed)}")
+    if over_budget:
+        print(f"\n❌ Over the {args.budget_ms:.0f} ms budget: {', '.join(over_budget)}")
+    if failed or over_budget:
+        return 1
+    print(f"\n✅ All modules import within {args.budget_ms:.0f} ms.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+# ============================================================
+# ⏱️ benchmark_sentiment_backends.py — Backend Parity & Latency Check
+# Compares the int8 / ONNX sentiment backends against fp32 on sample_data.csv:
+#   - Label agreement with the fp32 pipeline (fails below the threshold)
+#   - Per-text latency and peak RSS, each backend in its own process
+# Usage:
+#   python benchmark_sentiment_backends.py --backends int8 onnx --min-agreement 0.95
+# ============================================================
+
+import sys
+import csv
+import json
+import time
+import argparse
+import resource
+import subprocess
+
+
+def load_texts(csv_file="sample_data.csv", limit=None):
+    """Read the 'text' column of the sample dataset."""
+    with open(csv_file, newline="", encoding="utf-8") as f:
+        texts = [row["text"] for row in csv.DictReader(f) if row.get("text")]
+    return texts[:limit] if limit else texts
+
+
+def run_backend(backend, csv_file, limit, batch_size):
+    """Score the dataset with one backend in this process and print a JSON report."""
+    from sentiment_analysis import load_sentiment_model, resolve_backend, score_texts
+
+    texts = load_texts(csv_file, limit)
+
+    start = time.perf_counter()
+    load_sentiment_model(backend)
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = score_texts(texts, backend=backend, batch_size=batch_size)
+    infer_seconds = time.perf_counter() - start
+
+    # ru_maxrss is kilobytes on Linux
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    print(json.dumps({
+        # The backend that really ran, so a fallback is not reported as ONNX/int8
+        "backend": resolve_backend(backend),
+        "labels": [r["sentiment"] if r else None for r in results],
+        "load_seconds": round(load_seconds, 2),
+        "ms_per_text": round(infer_seconds * 1000 / max(len(texts), 1), 2),
+        "peak_rss_mb": round(rss_mb, 1)
+    }))
+
+
+def measure(backend, args):
+    """Run one backend in a fresh interpreter so RSS numbers don't mix."""
+    cmd = [
+        sys.executable, __file__, "--worker", backend,
+        "--csv", args.csv, "--batch-size", str(args.batch_size)
+    ]
+    if args.limit:
+        cmd += ["--limit", str(args.limit)]
+    output = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentiment backend parity and latency check")
+    parser.add_argument("--backends", nargs="+", default=["int8", "onnx"])
+    parser.add_argument("--csv", default="sample_data.csv")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--min-agreement", type=float, default=0.95)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_backend(args.worker, args.csv, args.limit, args.batch_size)
+        return 0
+
+    print(f"⏱️ Scoring {args.csv} with fp32 baseline…")
+    baseline = measure("fp32", args)
+    reports = [baseline]
+    failed = False
+
+    for backend in args.backends:
+        print(f"⏱️ Scoring {args.csv} with {backend}…")
+        report = measure(backend, args)
+        pairs = list(zip(baseline["labels"], report["labels"]))
+        report["agreement"] = round(sum(a == b for a, b in pairs) / max(len(pairs), 1), 3)
+        if report["agreement"] < args.min_agreement:
+            failed = True
+        reports.append(report)
+
+    print(f"\n{'backend':<8} {'agreement':>9} {'ms/text':>8} {'load s':>7} {'peak RSS MB':>12}")
+    for r in reports:
+        agreement = r.get("agreement", 1.0)
+        print(f"{r['backend']:<8} {agreement:>9.3f} {r['ms_per_text']:>8} {r['load_seconds']:>7} {r['peak_rss_mb']:>12}")
+
+    if failed:
+        print(f"\n❌ Label agreement below {args.min_agreement:.0%} for at least one backend.")
+        return 1
+    print("\n✅ All backends agree with fp32.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
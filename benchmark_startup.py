@@ -0,0 +1,103 @@
+# ============================================================
+# ⏱️ benchmark_startup.py — Gunicorn Startup & Memory Benchmark
+# Starts the app under gunicorn with and without preload_app and reports:
+#   - seconds until the first request succeeds
+#   - RSS and PSS (proportional set size) of the master and each worker
+# PSS splits shared pages between the processes that map them, so the
+# total PSS is the real memory cost of the server. Linux only (/proc).
+# Usage:
+#   python benchmark_startup.py --workers 4
+# ============================================================
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+import importlib.util
+import urllib.request
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def memory_kb(pid):
+    """(rss_kb, pss_kb) of one process, from /proc/<pid>/smaps_rollup."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:"):
+                values[parts[0]] = int(parts[1])
+    return values.get("Rss:", 0), values.get("Pss:", 0)
+
+
+def children(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(p) for p in f.read().split()]
+
+
+def wait_until_up(port, proc, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with code {proc.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError(f"server not up after {timeout}s")
+
+
+def measure(preload, workers, port, timeout):
+    env = dict(os.environ,
+               GUNICORN_PRELOAD="1" if preload else "0",
+               WEB_CONCURRENCY=str(workers),
+               GUNICORN_BIND=f"127.0.0.1:{port}")
+    started = time.monotonic()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"],
+        cwd=HERE, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_until_up(port, proc, timeout)
+        startup = time.monotonic() - started
+        # Let every worker finish booting before reading memory
+        time.sleep(2)
+        master = memory_kb(proc.pid)
+        worker_mem = [memory_kb(pid) for pid in children(proc.pid)]
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+    return {
+        "preload": preload,
+        "startup_s": round(startup, 2),
+        "master_rss_mb": round(master[0] / 1024, 1),
+        "worker_rss_mb": [round(rss / 1024, 1) for rss, _ in worker_mem],
+        "total_pss_mb": round((master[1] + sum(pss for _, pss in worker_mem)) / 1024, 1)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare gunicorn startup and memory with/without preload")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    if not all(importlib.util.find_spec(m) for m in ("torch", "transformers")):
+        # warm_up() then skips the model, so the numbers leave out its weights
+        print("⚠️ torch/transformers not installed: the sentiment model is NOT loaded; "
+              "memory figures exclude the model weights.")
+    print(f"⏱️ Starting gunicorn with {args.workers} worker(s)...\n")
+    results = [measure(preload, args.workers, args.port, args.timeout) for preload in (False, True)]
+    for r in results:
+        print(f"{'preload' if r['preload'] else 'per-worker':>10}: up in {r['startup_s']:>6.2f}s | "
+              f"master RSS {r['master_rss_mb']:>7.1f} MB | worker RSS {r['worker_rss_mb']} MB | "
+              f"total PSS {r['total_pss_mb']:>7.1f} MB")
+
+    base, pre = results
+    if pre["total_pss_mb"]:
+        print(f"\n📊 Preloading uses {base['total_pss_mb'] / pre['total_pss_mb']:.2f}x less total memory.")
@@ -0,0 +1,224 @@
+# ============================================================
+# 🎲 campaign_simulator.py — Vectorized Campaign Simulation Engine
+# Simulates N variants × D days × R replicates in one set of array
+# operations with a seeded NumPy Generator. Same model as the original
+# per-day loop: sentiment multiplier, 0.85 daily decay, 10% viral days.
+# ============================================================
+
+import threading
+import numpy as np
+
+SENTIMENT_MULTIPLIERS = {
+    "Positive": 1.3,
+    "Neutral": 1.0,
+    "Negative": 0.7
+}
+
+# One simulated day for one variant/replicate
+DAILY_DTYPE = np.dtype([
+    ("views", np.int64),
+    ("likes", np.int64),
+    ("shares", np.int64),
+    ("comments", np.int64),
+    ("engagement_rate", np.float64)
+])
+
+# Campaign totals for one variant/replicate (engagement_rate is the daily mean)
+TOTALS_DTYPE = DAILY_DTYPE
+
+# ============================================================
+# 🔹 Simulation
+# ============================================================
+
+def sentiment_multipliers(variants):
+    """Map each variant's sentiment label to its reach multiplier."""
+    return np.array([SENTIMENT_MULTIPLIERS.get(v.get("sentiment"), 1.0) for v in variants])
+
+
+def simulate_campaigns(multipliers, days=7, replicates=1, seed=None):
+    """
+    Simulate every variant/replicate/day at once.
+    multipliers: sequence of N sentiment multipliers.
+    seed: int, SeedSequence or np.random.Generator.
+    Returns a DAILY_DTYPE structured array of shape (N, R, D).
+    """
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    multipliers = np.asarray(multipliers, dtype=np.float64).reshape(-1, 1, 1)
+    shape = (multipliers.shape[0], replicates, days)
+
+    # Per-campaign draws, broadcast across days
+    base_views = rng.integers(1000, 3001, size=shape[:2] + (1,))
+    base_engagement = rng.uniform(0.05, 0.15, size=shape[:2] + (1,))  # 5-15% engagement rate
+
+    # Natural decay and viral days
+    decay = 0.85 ** np.arange(days)
+    viral_boost = np.where(rng.random(shape) > 0.9, 2.5, 1.0)
+
+    views = (base_views * multipliers * decay * viral_boost).astype(np.int64)
+    likes = (views * base_engagement * rng.uniform(0.8, 1.2, size=shape)).astype(np.int64)
+    shares = (likes * rng.uniform(0.2, 0.4, size=shape)).astype(np.int64)
+    comments = (likes * rng.uniform(0.1, 0.3, size=shape)).astype(np.int64)
+
+    engagement = (likes + shares + comments).astype(np.float64)
+    # Long horizons decay views to zero; report 0% instead of dividing by zero
+    rate = np.divide(engagement * 100, views, out=np.zeros(shape), where=views > 0)
+
+    daily = np.empty(shape, dtype=DAILY_DTYPE)
+    daily["views"] = views
+    daily["likes"] = likes
+    daily["shares"] = shares
+    daily["comments"] = comments
+    daily["engagement_rate"] = np.round(rate, 2)
+    return daily
+
+
+def summarize(daily):
+    """
+    Collapse the day axis of a simulation.
+    Returns a TOTALS_DTYPE array with the leading (N, R) shape.
+    """
+    totals = np.empty(daily.shape[:-1], dtype=TOTALS_DTYPE)
+    for field in ("views", "likes", "shares", "comments"):
+        totals[field] = daily[field].sum(axis=-1)
+    totals["engagement_rate"] = np.round(daily["engagement_rate"].mean(axis=-1), 2)
+    return totals
+
+
+def composite_scores(totals):
+    """Composite score used to rank variants: 60% weighted engagement, 40% reach."""
+    engagement_score = totals["likes"] + totals["shares"] * 2 + totals["comments"] * 1.5
+    return engagement_score * 0.6 + totals["views"] * 0.4
+
+
+# ============================================================
+# 🔹 Monte Carlo Replicates
+# ============================================================
+
+_pools = {}     # worker count → ProcessPoolExecutor
+_pools_lock = threading.Lock()
+
+
+def _get_pool(workers):
+    """
+    Reuse one process pool per size across calls so web requests don't pay
+    pool start-up. Pools are never shut down while in use: a call asking for
+    a different size gets its own pool instead of replacing a shared one.
+    Workers start via forkserver (spawn where unavailable), never a bare fork
+    of a threaded server process.
+    """
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+            _pools[workers] = pool
+        return pool
+
+
+def simulate_scores(multipliers, days, replicates, seed):
+    """
+    One batch of replicates (runs in a worker process).
+    Returns (composite, engagement_rate, views) arrays of shape (N, R).
+    """
+    totals = summarize(simulate_campaigns(multipliers, days, replicates, seed))
+    return composite_scores(totals), totals["engagement_rate"], totals["views"]
+
+
+def monte_carlo(multipliers, days=7, replicates=5000, batch_size=1000,
+                win_threshold=0.95, workers=None, seed=None):
+    """
+    Run replicate simulations in batches spread across a process pool.
+    After each round of batches the leader's win probability is checked;
+    once it passes win_threshold the remaining batches are skipped.
+    Returns a dict of per-variant arrays plus the replicate count used.
+    """
+    import os
+
+    if replicates < 1:
+        raise ValueError(f"replicates must be at least 1, got {replicates}")
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+    workers = min(4, os.cpu_count() or 1) if workers is None else workers
+    batches = max(1, -(-replicates // batch_size))
+    seeds = np.random.SeedSequence(seed).spawn(batches)
+    sizes = [min(batch_size, replicates - i * batch_size) for i in range(batches)]
+
+    composite, engagement, views = [], [], []
+    early_stopped = False
+    step = max(workers, 1)
+
+    for start in range(0, batches, step):
+        jobs = list(zip(sizes[start:start + step], seeds[start:start + step]))
+        if workers > 1:
+            pool = _get_pool(workers)
+            futures = [pool.submit(simulate_scores, multipliers, days, size, s) for size, s in jobs]
+            results = [f.result() for f in futures]
+        else:
+            results = [simulate_scores(multipliers, days, size, s) for size, s in jobs]
+
+        for c, e, v in results:
+            composite.append(c)
+            engagement.append(e)
+            views.append(v)
+
+        wins = np.bincount(np.concatenate(composite, axis=1).argmax(axis=0), minlength=len(multipliers))
+        if start + step < batches and wins.max() / wins.sum() >= win_threshold:
+            early_stopped = True
+            break
+
+    composite = np.concatenate(composite, axis=1)
+    return {
+        "composite": composite,
+        "engagement_rate": np.concatenate(engagement, axis=1),
+        "views": np.concatenate(views, axis=1),
+        "win_probability": wins / wins.sum(),
+        "replicates": composite.shape[1],
+        "early_stopped": early_stopped
+    }
+
+
+# ============================================================
+# 🔹 Dict Adapters (original output format)
+# ============================================================
+
+def daily_records(daily_row):
+    """Convert one (D,) run into the list-of-dicts format used across the pipeline."""
+    return [
+        {
+            "day": day + 1,
+            "views": int(d["views"]),
+            "likes": int(d["likes"]),
+            "shares": int(d["shares"]),
+            "comments": int(d["comments"]),
+            "engagement_rate": float(d["engagement_rate"])
+        }
+        for day, d in enumerate(daily_row)
+    ]
+
+
+def total_record(totals_item):
+    """Convert one totals element into a plain dict."""
+    return {
+        "views": int(totals_item["views"]),
+        "likes": int(totals_item["likes"]),
+        "shares": int(totals_item["shares"]),
+        "comments": int(totals_item["comments"]),
+        "engagement_rate": float(totals_item["engagement_rate"])
+    }
+
+
+# ============================================================
+# 🔹 Quick Benchmark
+# ============================================================
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    daily = simulate_campaigns([1.3, 1.0, 0.7, 1.0, 1.3], days=30, replicates=10000, seed=42)
+    totals = summarize(daily)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"🎲 Simulated {daily.size:,} variant-days in {elapsed:.1f} ms")
+    print(f"📈 Mean views per variant: {totals['views'].mean(axis=1).round(0)}")
@@ -0,0 +1,201 @@
+# ============================================================
+# 💾 checkpoint_store.py — Durable Per-Run Step Checkpoints
+# Handles:
+#   - Recording each pipeline step's output in SQLite as it finishes
+#   - Reloading finished steps so a rerun resumes at the first missing one
+#   - Clearing a run's checkpoints once it completes
+#   - A lease per run key, so two live runs of the same key never read
+#     or clear each other's checkpoints
+#   - Expiring checkpoints of abandoned runs after CHECKPOINT_TTL_SECONDS
+# Runs are identified by a key such as "content:<topic>".
+# Set CHECKPOINTS=0 to disable.
+# ============================================================
+
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", ".checkpoints.sqlite")
+CHECKPOINTS_ENABLED = os.getenv("CHECKPOINTS", "1") != "0"
+# Checkpoints older than this are ignored and purged (a run abandoned for good)
+CHECKPOINT_TTL_SECONDS = float(os.getenv("CHECKPOINT_TTL_SECONDS", str(24 * 3600)))
+# A lease not renewed (by a save) for this long is free for another run to take
+CHECKPOINT_LEASE_SECONDS = float(os.getenv("CHECKPOINT_LEASE_SECONDS", "600"))
+
+
+def _to_json(value):
+    # numpy scalars from the simulators → plain Python numbers
+    return json.dumps(value, ensure_ascii=False, default=lambda o: o.item() if hasattr(o, "item") else str(o))
+
+
+def _owner_dead(owner):
+    """True when a lease owner (host:pid:nonce) was a process on this host that no longer exists."""
+    host, pid, _ = owner.rsplit(":", 2)
+    if host != socket.gethostname():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except (OSError, ValueError):
+        return False
+    return False
+
+
+class CheckpointStore:
+    """
+    SQLite table of (run key, step) → JSON-encoded step output, plus a lease
+    table. Take the key with claim() before using it and release() it after:
+
+        run_key = store.claim(f"content:{topic}")
+        try:
+            ...steps, store.save(run_key, ...)...
+            store.clear(run_key)
+        finally:
+            store.release(run_key)
+    """
+
+    def __init__(self, path=CHECKPOINT_PATH, ttl=CHECKPOINT_TTL_SECONDS, lease=CHECKPOINT_LEASE_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        self.lease = lease
+        self._lock = threading.Lock()
+        self._conn = None
+        self._owners = {}       # run key → owner id of the leases this process holds
+
+    def _db(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                "run_key TEXT NOT NULL, step TEXT NOT NULL, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, PRIMARY KEY (run_key, step))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS leases ("
+                "run_key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def claim(self, run_key):
+        """
+        Lease run_key for this run and return the key to checkpoint under.
+        If another live run holds it, returns a private key instead: this run
+        then starts fresh and neither run can see or clear the other's steps.
+        """
+        owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            # Expired leases and checkpoints of long-abandoned runs
+            db.execute("DELETE FROM leases WHERE expires_at < ?", (now,))
+            row = db.execute("SELECT owner FROM leases WHERE run_key = ?", (run_key,)).fetchone()
+            if row is not None and _owner_dead(row[0]):
+                db.execute("DELETE FROM leases WHERE run_key = ?", (run_key,))
+            db.execute("DELETE FROM checkpoints WHERE created_at < ?", (now - self.ttl,))
+            taken = db.execute(
+                "INSERT OR IGNORE INTO leases (run_key, owner, expires_at) VALUES (?, ?, ?)",
+                (run_key, owner, now + self.lease)
+            ).rowcount
+            db.commit()
+            if not taken:
+                run_key = f"{run_key}#{owner}"
+                print("⚠️ Another run holds the checkpoints for this key; running without resume.")
+            self._owners[run_key] = owner
+        return run_key
+
+    def release(self, run_key):
+        """Give up the lease taken by claim() (the checkpoints stay, for a later resume)."""
+        with self._lock:
+            owner = self._owners.pop(run_key, None)
+            if owner is not None:
+                self._db().execute("DELETE FROM leases WHERE run_key = ? AND owner = ?", (run_key, owner))
+                self._db().commit()
+
+    def load(self, run_key):
+        """All finished, unexpired steps of a run: {step: output}."""
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT step, value FROM checkpoints WHERE run_key = ? AND created_at >= ?",
+                (run_key, time.time() - self.ttl)
+            ).fetchall()
+        return {step: json.loads(value) for step, value in rows}
+
+    def save(self, run_key, step, value):
+        """
+        Record a finished step (committed immediately, so a crash right after keeps it).
+        Also renews the run's lease.
+        """
+        now = time.time()
+        with self._lock:
+            self._db().execute(
+                "INSERT OR REPLACE INTO checkpoints (run_key, step, value, created_at) VALUES (?, ?, ?, ?)",
+                (run_key, step, _to_json(value), now)
+            )
+            self._db().execute(
+                "UPDATE leases SET expires_at = ? WHERE run_key = ? AND owner = ?",
+                (now + self.lease, run_key, self._owners.get(run_key))
+            )
+            self._db().commit()
+
+    def clear(self, run_key):
+        """Forget a run once it has completed."""
+        with self._lock:
+            self._db().execute("DELETE FROM checkpoints WHERE run_key = ?", (run_key,))
+            self._db().commit()
+
+    def step(self, run_key, name, fn, done=None):
+        """
+        Return the checkpointed output of step `name`, or run fn() and record it.
+        done: the dict from load(), to avoid a query per step.
+        """
+        done = self.load(run_key) if done is None else done
+        if name in done:
+            print(f"♻️ Resuming: step '{name}' restored from checkpoint.")
+            return done[name]
+        value = fn()
+        self.save(run_key, name, value)
+        return value
+
+
+class _NoCheckpoints:
+    """Stand-in used when CHECKPOINTS=0: nothing is stored or restored."""
+
+    def claim(self, run_key):
+        return run_key
+
+    def release(self, run_key):
+        pass
+
+    def load(self, run_key):
+        return {}
+
+    def save(self, run_key, step, value):
+        pass
+
+    def clear(self, run_key):
+        pass
+
+    def step(self, run_key, name, fn, done=None):
+        return fn()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_checkpoint_store():
+    """Return the process-wide checkpoint store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = CheckpointStore() if CHECKPOINTS_ENABLED else _NoCheckpoints()
+        return _store
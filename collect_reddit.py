@@ -1,9 +1,6 @@
 import os
-import praw
-import pandas as pd
+from functools import lru_cache
 from dotenv import load_dotenv
-from googleapiclient.discovery import build
-from google.oauth2.service_account import Credentials
 
 # ==============================================================
 # 1️⃣ Load environment variables
@@ -18,20 +15,23 @@ GOOGLE_SHEET_ID = os.getenv("GOOGLE_SHEET_ID")
 GOOGLE_CREDENTIALS_FILE = os.getenv("GOOGLE_SHEETS_CREDENTIALS", "credentials.json")
 
 # ==============================================================
-# 2️⃣ Initialize Reddit client
+# 2️⃣ Initialize Reddit client (on first use)
 # ==============================================================
-reddit = praw.Reddit(
-    client_id=REDDIT_CLIENT_ID,
-    client_secret=REDDIT_CLIENT_SECRET,
-    user_agent=REDDIT_USER_AGENT,
-)
+@lru_cache(maxsize=1)
+def get_reddit():
+    import praw
+    return praw.Reddit(
+        client_id=REDDIT_CLIENT_ID,
+        client_secret=REDDIT_CLIENT_SECRET,
+        user_agent=REDDIT_USER_AGENT,
+    )
 
 # ==============================================================
 # 3️⃣ Fetch posts from subreddit
 # ==============================================================
 def fetch_reddit_posts(subreddit_name="marketing", limit=50):
     print(f"📥 Fetching {limit} posts from r/{subreddit_name}...")
-    subreddit = reddit.subreddit(subreddit_name)
+    subreddit = get_reddit().subreddit(subreddit_name)
     rows = [["platform", "post_id", "title", "score", "comments", "url"]]
 
     for post in subreddit.hot(limit=limit):
@@ -73,10 +73,10 @@ def ensure_reddit_sheet_exists(service):
 # 5️⃣ Write data to Google Sheets
 # ==============================================================
 def write_to_sheets(data, sheet_range="Reddit!A1"):
-    creds = Credentials.from_service_account_file(
-        GOOGLE_CREDENTIALS_FILE, scopes=["https://www.googleapis.com/auth/spreadsheets"]
-    )
-    service = build("sheets", "v4", credentials=creds)
+    # Live API or local emulator, per $SHEETS_BACKEND
+    from sheets_backend import get_sheets_service
+
+    service = get_sheets_service(GOOGLE_CREDENTIALS_FILE)
 
     # ✅ Ensure the Reddit sheet exists
     ensure_reddit_sheet_exists(service)
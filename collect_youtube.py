@@ -1,8 +1,6 @@
 import os
 import requests
 from dotenv import load_dotenv
-from googleapiclient.discovery import build
-from google.oauth2.service_account import Credentials
 
 # ==============================================================
 # 1️⃣ Load environment variables
@@ -48,10 +46,10 @@ def fetch_video_stats(video_id):
 # 3️⃣ Write results to Google Sheets
 # ==============================================================
 def write_to_sheets(data, sheet_range="Sheet1!A1"):
-    creds = Credentials.from_service_account_file(
-        GOOGLE_CREDENTIALS_FILE, scopes=["https://www.googleapis.com/auth/spreadsheets"]
-    )
-    service = build("sheets", "v4", credentials=creds)
+    # Live API or local emulator, per $SHEETS_BACKEND
+    from sheets_backend import get_sheets_service
+
+    service = get_sheets_service(GOOGLE_CREDENTIALS_FILE)
     sheet = service.spreadsheets()
 
     body = {"values": data}
@@ -0,0 +1,81 @@
+# ============================================================
+# 🧮 content_features.py — Vectorized Content Feature Extraction
+# Handles:
+#   - Word, hashtag, emoji and call-to-action features for a whole
+#     column of texts at once (pandas string ops, one compiled CTA regex)
+#   - The prediction factor scores as numpy arrays
+#   - Bulk scoring of the feature matrix (100k posts in seconds)
+# Feature definitions match predict_content_performance exactly.
+# ============================================================
+
+import re
+import numpy as np
+import pandas as pd
+
+CTA_KEYWORDS = ["click", "learn", "discover", "join", "get", "try", "download"]
+
+# One alternation instead of a keyword loop; plain substring matching, like `keyword in text`
+CTA_PATTERN = re.compile("|".join(re.escape(k) for k in CTA_KEYWORDS))
+
+SENTIMENT_SCORES = {"Positive": 1.3, "Neutral": 1.0, "Negative": 0.7}
+
+
+def has_cta(text: str) -> bool:
+    """Scalar CTA check used by the single-content predictor."""
+    return CTA_PATTERN.search(text.lower()) is not None
+
+
+def extract_features(contents) -> pd.DataFrame:
+    """
+    Feature matrix for a sequence / Series of texts, one row per text:
+        word_count, hashtag_count, has_emoji, has_cta
+    """
+    texts = contents if isinstance(contents, pd.Series) else pd.Series(list(contents), dtype=object)
+    texts = texts.fillna("").astype(str)
+    return pd.DataFrame({
+        # str.split() with no separator splits on whitespace runs, like content.split()
+        "word_count": texts.str.split().str.len().to_numpy(np.int64),
+        "hashtag_count": texts.str.count("#").to_numpy(np.int64),
+        # any char with ord > 127 counts as an emoji
+        "has_emoji": texts.str.contains(r"[^\x00-\x7f]", regex=True).to_numpy(bool),
+        "has_cta": texts.str.lower().str.contains(CTA_PATTERN, regex=True).to_numpy(bool),
+    }, index=texts.index)
+
+
+def factor_scores(features: pd.DataFrame, sentiments) -> pd.DataFrame:
+    """Per-factor multipliers and their product, as in predict_content_performance."""
+    words = features["word_count"].to_numpy()
+    scores = pd.DataFrame({
+        "sentiment_score": pd.Series(list(sentiments), index=features.index).map(SENTIMENT_SCORES).to_numpy(float),
+        "length_score": np.where((words >= 15) & (words <= 30), 1.2, 0.9),
+        "hashtag_score": np.minimum(1.0 + features["hashtag_count"].to_numpy() * 0.1, 1.3),
+        "emoji_score": np.where(features["has_emoji"].to_numpy(), 1.15, 1.0),
+        "cta_score": np.where(features["has_cta"].to_numpy(), 1.2, 1.0),
+    }, index=features.index)
+    scores["composite_multiplier"] = scores.prod(axis=1)
+    return scores
+
+
+def score_features(features: pd.DataFrame, sentiments, seed=None) -> pd.DataFrame:
+    """
+    Bulk counterpart of predict_content_performance's metric step: draws the
+    same random bases as numpy arrays and returns one prediction row per text.
+    """
+    rng = np.random.default_rng(seed)
+    scores = factor_scores(features, sentiments)
+    multiplier = scores["composite_multiplier"].to_numpy()
+    n = len(multiplier)
+
+    views = (rng.integers(1500, 3501, n) * multiplier).astype(np.int64)
+    engagement = np.round(rng.uniform(3, 12, n) * multiplier, 2)
+    likes = (views * (engagement / 100)).astype(np.int64)
+    shares = (likes * rng.uniform(0.2, 0.4, n)).astype(np.int64)
+    confidence = np.round(np.minimum(95, 60 + (multiplier - 1) * 50), 1)
+
+    return pd.concat([features, scores, pd.DataFrame({
+        "predicted_views": views,
+        "predicted_likes": likes,
+        "predicted_shares": shares,
+        "predicted_engagement_rate": engagement,
+        "confidence": confidence,
+    }, index=features.index)], axis=1)
@@ -0,0 +1,278 @@
+# ============================================================
+# 📈 engagement_model.py — Trainable Engagement Model
+# Handles:
+#   - Training a ridge regression on historical posts:
+#       sample_data.csv  → likes + retweets + replies
+#       reddit_data.csv  → score + comments
+#   - Features: hashed word/hashtag tokens + the content factor features
+#     (length, hashtags, emojis, CTA); per-platform intercepts are fitted
+#     unpenalized, so the model never does worse than the platform means
+#   - Ridge alpha picked by cross-validation
+#   - Saving the weights atomically to a compact .npz
+#   - Training policy: only `python engagement_model.py --train` trains.
+#     The CLI predictors and the server's warm-up just load the file and,
+#     when it is missing, skip the model (no expected_engagement field)
+#   - Deterministic, batched predictions of expected interactions
+# Usage:
+#   python engagement_model.py --train
+#   python engagement_model.py --benchmark 100000
+#   python benchmark_engagement_model.py      # held-out error vs baselines
+# ============================================================
+
+import os
+import re
+import zlib
+import time
+import argparse
+import tempfile
+from functools import lru_cache
+import numpy as np
+
+MODEL_PATH = os.getenv("ENGAGEMENT_MODEL_PATH", "engagement_model.npz")
+# ~150 training posts: keep the hashed vocabulary small and let CV pick the penalty
+HASH_BUCKETS = 2 ** 10
+RIDGE_ALPHAS = (1.0, 3.0, 10.0, 30.0, 100.0)
+CV_FOLDS = 5
+PLATFORMS = ["twitter", "reddit"]
+TOKEN_PATTERN = re.compile(r"[#@]?\w+")
+
+
+# ============================================================
+# 🔹 Features
+# ============================================================
+
+@lru_cache(maxsize=200_000)
+def _bucket(token):
+    # crc32, not hash(): Python's string hash changes between processes
+    return zlib.crc32(token.encode("utf-8")) % HASH_BUCKETS
+
+
+def token_entries(contents):
+    """
+    Sparse hashed token counts, L2-normalized per text.
+    Returns (rows, buckets, values) arrays, one entry per distinct bucket in a text.
+    """
+    rows, buckets, values = [], [], []
+    for i, text in enumerate(contents):
+        counts = {}
+        for token in TOKEN_PATTERN.findall(text.lower()):
+            b = _bucket(token)
+            counts[b] = counts.get(b, 0) + 1
+        if counts:
+            norm = sum(c * c for c in counts.values()) ** 0.5
+            rows.extend([i] * len(counts))
+            buckets.extend(counts)
+            values.extend(c / norm for c in counts.values())
+    return np.array(rows, dtype=np.int64), np.array(buckets, dtype=np.int64), np.array(values, dtype=np.float64)
+
+
+def dense_features(contents, platform="twitter"):
+    """Factor features, platform one-hot and bias: the non-token columns of the design matrix."""
+    from content_features import extract_features
+
+    platforms = [platform] * len(contents) if isinstance(platform, str) else list(platform)
+    f = extract_features(contents)
+    words = f["word_count"].to_numpy(np.float64)
+    platform_cols = np.array([[p.lower() == name for name in PLATFORMS] for p in platforms], dtype=np.float64)
+    return np.column_stack([
+        np.log1p(words),
+        ((words >= 15) & (words <= 30)).astype(np.float64),
+        np.minimum(f["hashtag_count"].to_numpy(np.float64), 10) / 10,
+        f["has_emoji"].to_numpy(np.float64),
+        f["has_cta"].to_numpy(np.float64),
+        platform_cols.reshape(len(contents), len(PLATFORMS)),
+        np.ones(len(contents)),
+    ])
+
+
+def _clean(contents):
+    return ["" if c is None else str(c) for c in contents]
+
+
+def featurize(contents, platform="twitter"):
+    """
+    Full dense design matrix (used for training): hashed tokens followed by
+    the dense features. platform may be one name or one per text.
+    """
+    contents = _clean(contents)
+    tokens = np.zeros((len(contents), HASH_BUCKETS))
+    rows, buckets, values = token_entries(contents)
+    np.add.at(tokens, (rows, buckets), values)
+    return np.hstack([tokens, dense_features(contents, platform)])
+
+
+# ============================================================
+# 🔹 Training
+# ============================================================
+
+def load_training_data(tweets_csv="sample_data.csv", reddit_csv="reddit_data.csv"):
+    """(texts, platforms, engagement) from the historical CSVs."""
+    import pandas as pd
+
+    tweets = pd.read_csv(tweets_csv, usecols=["text", "like_count", "retweet_count", "reply_count"])
+    reddit = pd.read_csv(reddit_csv, usecols=["title", "score", "comments"])
+
+    texts = tweets["text"].fillna("").tolist() + reddit["title"].fillna("").tolist()
+    platforms = ["twitter"] * len(tweets) + ["reddit"] * len(reddit)
+    engagement = np.concatenate([
+        tweets[["like_count", "retweet_count", "reply_count"]].fillna(0).sum(axis=1).to_numpy(float),
+        reddit[["score", "comments"]].fillna(0).sum(axis=1).to_numpy(float),
+    ])
+    return texts, platforms, np.clip(engagement, 0, None)
+
+
+def fit_ridge(X, y, alpha):
+    """Closed-form ridge regression; solves the smaller of the primal/dual systems."""
+    X = X.astype(np.float64)
+    n, d = X.shape
+    if n < d:
+        return X.T @ np.linalg.solve(X @ X.T + alpha * np.eye(n), y)
+    return np.linalg.solve(X.T @ X + alpha * np.eye(d), X.T @ y)
+
+
+def platform_means(y, platforms):
+    """Mean target per platform (the baseline the model must beat), plus the overall mean."""
+    platforms = np.asarray(platforms)
+    means = {name: float(y[platforms == name].mean()) for name in PLATFORMS if (platforms == name).any()}
+    return means, float(y.mean())
+
+
+def fit_model(X, y, platforms, alpha):
+    """
+    Weights over the full featurize() columns. Platform intercepts are the
+    (unpenalized) platform means; ridge fits only the remaining signal on
+    centered token + factor columns, so a large alpha falls back to the means.
+    """
+    means, overall = platform_means(y, platforms)
+    offsets = np.array([means.get(p.lower(), overall) for p in platforms])
+    features = X[:, :-len(PLATFORMS) - 1]
+    center = features.mean(axis=0)
+    w = fit_ridge(features - center, y - offsets, alpha)
+    shift = float(center @ w)
+    # Fold the centering into the platform and bias columns: x·w + (mean_p - center·w)
+    platform_w = [means.get(name, overall) - overall for name in PLATFORMS]
+    return np.concatenate([w, platform_w, [overall - shift]])
+
+
+def _folds(n, folds, seed):
+    order = np.random.default_rng(seed).permutation(n)
+    return np.array_split(order, folds)
+
+
+def cross_validate(X, y, platforms, alpha, folds=CV_FOLDS, repeats=1):
+    """
+    Held-out errors (log scale) of the model and of two baselines, averaged
+    over `repeats` shuffles of k-fold CV:
+        global_mean   → one mean for every post
+        platform_mean → per-platform mean (what the text features must improve on)
+    """
+    platforms = np.asarray(platforms)
+    errors = {"model": [], "platform_mean": [], "global_mean": []}
+    for repeat in range(repeats):
+        for test in _folds(len(y), folds, repeat):
+            train = np.setdiff1d(np.arange(len(y)), test)
+            means, overall = platform_means(y[train], platforms[train])
+            errors["model"].append(X[test] @ fit_model(X[train], y[train], platforms[train], alpha) - y[test])
+            errors["platform_mean"].append(np.array([means.get(p, overall) for p in platforms[test]]) - y[test])
+            errors["global_mean"].append(np.full(len(test), overall) - y[test])
+    report = {}
+    for name, parts in errors.items():
+        e = np.concatenate(parts)
+        report[name] = {"mae": round(float(np.abs(e).mean()), 4), "rmse": round(float(np.sqrt((e ** 2).mean())), 4)}
+    return report
+
+
+def choose_alpha(X, y, platforms, alphas=RIDGE_ALPHAS):
+    """Alpha with the lowest cross-validated RMSE."""
+    scores = {alpha: cross_validate(X, y, platforms, alpha)["model"]["rmse"] for alpha in alphas}
+    return min(scores, key=scores.get)
+
+
+def save_model(weights, path, **meta):
+    """Write to a temp file next to `path`, then rename: readers never see a partial file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".engagement_model.", suffix=".npz")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez_compressed(f, weights=weights, hash_buckets=HASH_BUCKETS, **meta)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def train_engagement_model(path=MODEL_PATH, alpha=None):
+    """
+    Fit on log1p(engagement) with alpha chosen by CV (unless given), report
+    the held-out error against the baselines, then refit on all rows and
+    save. Returns the evaluation metrics.
+    """
+    texts, platforms, engagement = load_training_data()
+    X = featurize(texts, platforms)
+    y = np.log1p(engagement)
+
+    alpha = choose_alpha(X, y, platforms) if alpha is None else alpha
+    metrics = dict(cross_validate(X, y, platforms, alpha), rows=int(len(y)), alpha=alpha)
+
+    weights = fit_model(X, y, platforms, alpha).astype(np.float32)   # float32 halves the file
+    save_model(weights, path, alpha=alpha)
+    load_engagement_model.cache_clear()
+    print(f"✅ Engagement model trained on {metrics['rows']} posts (alpha {alpha:g}) → {path}; "
+          f"CV RMSE {metrics['model']['rmse']} vs platform mean {metrics['platform_mean']['rmse']} "
+          f"vs global mean {metrics['global_mean']['rmse']} (log scale)")
+    return metrics
+
+
+# ============================================================
+# 🔹 Inference
+# ============================================================
+
+@lru_cache(maxsize=1)
+def load_engagement_model(path=MODEL_PATH):
+    """
+    Weights vector, loaded once. Never trains here: concurrent server workers
+    would race to write the file. Train with `python engagement_model.py --train`.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} not found; run `python engagement_model.py --train`")
+    with np.load(path) as saved:
+        if int(saved["hash_buckets"]) != HASH_BUCKETS:
+            raise ValueError(f"{path} was trained with {int(saved['hash_buckets'])} hash buckets, expected {HASH_BUCKETS}")
+        return saved["weights"]
+
+
+def predict_engagement(contents, platform="twitter"):
+    """Expected interactions (likes + shares + replies / score + comments) per text."""
+    weights = load_engagement_model().astype(np.float64)
+    contents = _clean(contents)
+    # Token part as a sparse dot product: no dense HASH_BUCKETS-wide matrix at inference
+    rows, buckets, values = token_entries(contents)
+    score = np.bincount(rows, weights=values * weights[buckets], minlength=len(contents))
+    score += dense_features(contents, platform) @ weights[HASH_BUCKETS:]
+    return np.clip(np.expm1(score), 0, None)
+
+
+# ============================================================
+# 🧩 Train / Benchmark
+# ============================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train or benchmark the engagement model")
+    parser.add_argument("--train", action="store_true", help="fit on the CSVs and save the model")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="time N predictions")
+    args = parser.parse_args()
+
+    if args.train:
+        train_engagement_model()
+    load_engagement_model()
+
+    if args.benchmark:
+        texts, platforms, _ = load_training_data()
+        sample = (texts * (args.benchmark // len(texts) + 1))[:args.benchmark]
+        start = time.perf_counter()
+        first = predict_engagement(sample)
+        elapsed = time.perf_counter() - start
+        again = predict_engagement(sample[:1000])
+        print(f"⚡ {args.benchmark:,} predictions in {elapsed:.2f}s ({args.benchmark / elapsed:,.0f}/s), "
+              f"deterministic: {bool(np.array_equal(first[:1000], again))}")
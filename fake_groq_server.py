@@ -0,0 +1,180 @@
+# ============================================================
+# 🧪 fake_groq_server.py — Local Fake Groq API for Load Testing
+# Serves /openai/v1/chat/completions (blocking or streamed) with simulated latency and its own
+# requests-per-minute quota, answering 429 + Retry-After when exceeded.
+# Usage:
+#   python fake_groq_server.py --port 8765 --rpm 30 --latency 0.4
+#   python fake_groq_server.py --load 60      # serve + drive the real client
+# Point the pipeline at it with GROQ_BASE_URL=http://127.0.0.1:8765
+# ============================================================
+
+import json
+import time
+import argparse
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeGroqState:
+    """Sliding one-minute request window shared by all handler threads."""
+
+    def __init__(self, rpm, latency):
+        self.rpm = rpm
+        self.latency = latency
+        self.window = deque()
+        self.lock = threading.Lock()
+        self.stats = {"ok": 0, "rate_limited": 0}
+
+    def admit(self):
+        """Return 0 if the request fits the quota, else seconds until it would."""
+        now = time.monotonic()
+        with self.lock:
+            while self.window and now - self.window[0] >= 60:
+                self.window.popleft()
+            if len(self.window) >= self.rpm:
+                self.stats["rate_limited"] += 1
+                return 60 - (now - self.window[0])
+            self.window.append(now)
+            self.stats["ok"] += 1
+            return 0
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, status, body, headers=None):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _send_stream(self, request, content):
+            """Send the completion as SSE chunks, one word at a time."""
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            created = int(time.time())
+            words = content.split(" ")
+            for i, word in enumerate(words):
+                chunk = {
+                    "id": f"chatcmpl-fake-{created}",
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": request.get("model", "fake"),
+                    "choices": [{
+                        "index": 0,
+                        "delta": {"content": word + (" " if i < len(words) - 1 else "")},
+                        "finish_reason": "stop" if i == len(words) - 1 else None
+                    }]
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(0.02)
+            self.wfile.write(b"data: [DONE]\n\n")
+
+        def do_POST(self):
+            if self.path != "/openai/v1/chat/completions":
+                self._send_json(404, {"error": {"message": "not found"}})
+                return
+
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            wait = state.admit()
+            if wait:
+                self._send_json(
+                    429,
+                    {"error": {"message": "Rate limit reached", "type": "tokens", "code": "rate_limit_exceeded"}},
+                    {"retry-after": f"{wait:.2f}"}
+                )
+                return
+
+            time.sleep(state.latency)
+            prompt = request["messages"][-1]["content"].strip().splitlines()[0]
+            content = f"🚀 Fake post for: {prompt[:60]} #AI #Marketing"
+            if request.get("stream"):
+                self._send_stream(request, content)
+                return
+            self._send_json(200, {
+                "id": f"chatcmpl-fake-{time.time_ns()}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "fake"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }],
+                "usage": {"prompt_tokens": 50, "completion_tokens": 20, "total_tokens": 70}
+            })
+
+    return Handler
+
+
+def start_server(port=8765, rpm=30, latency=0.4):
+    """Start the fake server on a background thread. Returns (server, state)."""
+    state = FakeGroqState(rpm, latency)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def run_load(port, total, concurrency):
+    """Drive generate_marketing_content through the limiter against the fake server."""
+    import os
+    from concurrent.futures import ThreadPoolExecutor
+
+    os.environ["GROQ_BASE_URL"] = f"http://127.0.0.1:{port}"
+    os.environ.setdefault("GROQ_API_KEY", "fake-key")
+    os.environ["LLM_CACHE_MODE"] = "off"
+
+    from generate_content import generate_marketing_content
+    from rate_limiter import get_groq_limiter
+
+    start = time.monotonic()
+    errors = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(generate_marketing_content, f"topic {i}") for i in range(total)]
+        for f in futures:
+            try:
+                f.result()
+            except Exception:
+                errors += 1
+    elapsed = time.monotonic() - start
+    return {
+        "requests": total,
+        "errors": errors,
+        "seconds": round(elapsed, 1),
+        "throughput_per_min": round(total / elapsed * 60, 1),
+        "limiter": get_groq_limiter().metrics()
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local fake Groq API")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rpm", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.4)
+    parser.add_argument("--load", type=int, default=0, help="fire this many requests through the client, then exit")
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    server, state = start_server(args.port, args.rpm, args.latency)
+    print(f"🧪 Fake Groq API on http://127.0.0.1:{args.port} ({args.rpm} RPM, {args.latency}s latency)")
+
+    if args.load:
+        report = run_load(args.port, args.load, args.concurrency)
+        print(f"📊 Load result: {report}")
+        print(f"📊 Server saw: {state.stats}")
+        server.shutdown()
+    else:
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.shutdown()
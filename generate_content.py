@@ -5,17 +5,13 @@
 from dotenv import load_dotenv
 load_dotenv()
 
-import os
-from groq import Groq
+from llm_cache import cached_completion, cached_stream
+# Groq client and rate-limited call helpers, shared with optimize_content
+from groq_client import complete, stream
 
-# Initialize Groq client using API key from .env
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
 
-def generate_marketing_content(topic, platform="twitter", tone="engaging"):
-    """
-    Generate marketing content using Groq’s free LLaMA-3.1-8B-Instant model.
-    Equivalent functionality to the original OpenAI GPT version.
-    """
+def build_request(topic, platform="twitter", tone="engaging"):
+    """Chat request for a marketing post; shared by the blocking and streaming paths."""
     prompt = f"""
     You are a professional marketing content creator.
     Generate a {tone} {platform} post about '{topic}'.
@@ -23,18 +19,35 @@ def generate_marketing_content(topic, platform="twitter", tone="engaging"):
     and include 2–3 relevant hashtags with emojis.
     """
 
-    print("🚀 Generating content using Groq LLaMA-3.1 …")
-
-    response = client.chat.completions.create(
-        model="llama-3.1-8b-instant",  # ✅ Correct model
-        messages=[
+    return {
+        "model": "llama-3.1-8b-instant",  # ✅ Correct model
+        "messages": [
             {"role": "system", "content": "You are an expert marketing copywriter."},
             {"role": "user", "content": prompt}
         ],
-        temperature=0.8,
-        max_tokens=250
-    )
+        "temperature": 0.8,
+        "max_tokens": 250
+    }
+
+def generate_marketing_content(topic, platform="twitter", tone="engaging", variant=None):
+    """
+    Generate marketing content using Groq’s free LLaMA-3.1-8B-Instant model.
+    Equivalent functionality to the original OpenAI GPT version.
+    Pass a distinct `variant` label (e.g. an A/B variant id) to get an
+    independent sample instead of the cached text for the same prompt.
+    """
+    print("🚀 Generating content using Groq LLaMA-3.1 …")
 
-    content = response.choices[0].message.content.strip()
+    # Identical prompts (and variant labels) are served from the response cache (see llm_cache.py)
+    content = cached_completion(build_request(topic, platform, tone), complete, variant)
     print("✅ Content generated successfully.")
     return content
+
+
+def stream_marketing_content(topic, platform="twitter", tone="engaging"):
+    """
+    Same as generate_marketing_content, but yields text as tokens arrive.
+    A cached response is yielded in one piece.
+    """
+    print("🚀 Streaming content from Groq LLaMA-3.1 …")
+    yield from cached_stream(build_request(topic, platform, tone), stream)
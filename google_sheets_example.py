@@ -7,9 +7,8 @@
 # ============================================================
 
 import os
-import pandas as pd
-from googleapiclient.discovery import build
-from google.oauth2 import service_account
+import random
+import threading
 from dotenv import load_dotenv
 
 # ============================================================
@@ -20,79 +19,186 @@ load_dotenv()
 SHEET_ID = os.getenv("GOOGLE_SHEET_ID")
 CRED_PATH = os.getenv("GOOGLE_SHEETS_CREDENTIALS", "credentials.json")
 
-print(f"Using Sheet ID: {SHEET_ID}")
-print(f"Using Credentials: {CRED_PATH}")
-
 # ============================================================
-# 🔹 Authenticate Google Sheets API
+# 🔹 Authenticate Google Sheets API (on first use)
 # ============================================================
-SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
-creds = service_account.Credentials.from_service_account_file(CRED_PATH, scopes=SCOPES)
-service = build("sheets", "v4", credentials=creds)
+_service = None
+
+
+def get_service():
+    """Build the Sheets client the first time it is needed."""
+    global _service
+    if _service is None:
+        # Live API or local emulator, per $SHEETS_BACKEND (see sheets_backend.py)
+        from sheets_backend import get_sheets_service
+
+        print(f"Using Sheet ID: {SHEET_ID}")
+        print(f"Using Credentials: {CRED_PATH}")
+        _service = get_sheets_service(CRED_PATH)
+    return _service
 
 # ============================================================
 # 🧩 Milestone 1: Upload CSV Data to main Sheet
 # ============================================================
-csv_file = "sample_data.csv"
-if os.path.exists(csv_file):
+
+def upload_csv_to_sheet(csv_file="sample_data.csv", tab_name="Sheet1"):
+    """
+    Replace the contents of a tab with a CSV file (header row included).
+    """
+    import pandas as pd
+
+    if not os.path.exists(csv_file):
+        print(f"⚠️ {csv_file} not found. Skipping upload step.")
+        return
+
     df = pd.read_csv(csv_file)
-    if not df.empty:
-        values = [df.columns.tolist()] + df.values.tolist()
-        try:
-            service.spreadsheets().values().clear(
-                spreadsheetId=SHEET_ID,
-                range="Sheet1!A1"
-            ).execute()
+    if df.empty:
+        print(f"⚠️ {csv_file} is empty — no tweets to upload.")
+        return
 
-            service.spreadsheets().values().update(
-                spreadsheetId=SHEET_ID,
-                range="Sheet1!A1",
-                valueInputOption="RAW",
-                body={"values": values}
-            ).execute()
+    values = [df.columns.tolist()] + df.values.tolist()
+    try:
+        service = get_service()
+        service.spreadsheets().values().clear(
+            spreadsheetId=SHEET_ID,
+            range=f"{tab_name}!A1"
+        ).execute()
+
+        service.spreadsheets().values().update(
+            spreadsheetId=SHEET_ID,
+            range=f"{tab_name}!A1",
+            valueInputOption="RAW",
+            body={"values": values}
+        ).execute()
 
-            print(f"✅ Uploaded {len(df)} rows from sample_data.csv to Google Sheets (Sheet1).")
-        except Exception as e:
-            print("❌ Error uploading data:", e)
-    else:
-        print("⚠️ sample_data.csv is empty — no tweets to upload.")
-else:
-    print("⚠️ sample_data.csv not found. Skipping upload step.")
+        print(f"✅ Uploaded {len(df)} rows from {csv_file} to Google Sheets ({tab_name}).")
+    except Exception as e:
+        print("❌ Error uploading data:", e)
 
 # ============================================================
-# 🧩 Helper Function: Ensure a tab exists with headers
+# 🧩 Helper: Process-wide Tab Registry
+# Spreadsheet metadata is fetched once; missing tabs are created
+# (with headers) in a single batchUpdate. The registry is dropped when
+# the API reports an unknown tab/range so the next call reloads it.
 # ============================================================
 
+def row_data(values: list):
+    """Convert a row of Python values into Sheets CellData (RAW semantics)."""
+    cells = []
+    for value in values:
+        if isinstance(value, bool):
+            cells.append({"userEnteredValue": {"boolValue": value}})
+        elif isinstance(value, (int, float)):
+            cells.append({"userEnteredValue": {"numberValue": value}})
+        else:
+            cells.append({"userEnteredValue": {"stringValue": "" if value is None else str(value)}})
+    return {"values": cells}
+
+
+def is_missing_tab_error(error) -> bool:
+    """True for the errors the API returns when a cached tab no longer exists."""
+    status = getattr(getattr(error, "resp", None), "status", None)
+    message = str(error)
+    return (
+        str(status) == "404"
+        or "Unable to parse range" in message
+        or "No grid with id" in message
+    )
+
+
+class TabRegistry:
+    """Title → sheetId map for the spreadsheet, loaded once per process."""
+
+    def __init__(self):
+        self._tabs = None
+        self._lock = threading.RLock()
+
+    def tabs(self) -> dict:
+        with self._lock:
+            if self._tabs is None:
+                metadata = get_service().spreadsheets().get(
+                    spreadsheetId=SHEET_ID, fields="sheets.properties(sheetId,title)"
+                ).execute()
+                self._tabs = {
+                    s["properties"]["title"]: s["properties"]["sheetId"]
+                    for s in metadata.get("sheets", [])
+                }
+            return self._tabs
+
+    def sheet_id(self, tab_name: str):
+        return self.tabs().get(tab_name)
+
+    def creation_requests(self, tab_headers: dict) -> list:
+        """
+        batchUpdate requests that add each missing tab and write its header row.
+        New sheetIds are chosen here so headers and rows can target them in
+        the same request. Call mark_created() once the request succeeds.
+        """
+        with self._lock:
+            tabs = self.tabs()
+            requests = []
+            for tab_name, headers in tab_headers.items():
+                if tab_name in tabs:
+                    continue
+                sheet_id = random.randint(1, 2**31 - 1)
+                while sheet_id in tabs.values():
+                    sheet_id = random.randint(1, 2**31 - 1)
+                requests.append({"addSheet": {"properties": {"title": tab_name, "sheetId": sheet_id}}})
+                if headers:
+                    requests.append({"updateCells": {
+                        "start": {"sheetId": sheet_id, "rowIndex": 0, "columnIndex": 0},
+                        "rows": [row_data(headers)],
+                        "fields": "userEnteredValue"
+                    }})
+            return requests
+
+    def mark_created(self, requests: list):
+        with self._lock:
+            for request in requests:
+                if "addSheet" in request:
+                    props = request["addSheet"]["properties"]
+                    self.tabs()[props["title"]] = props["sheetId"]
+
+    def invalidate(self):
+        with self._lock:
+            self._tabs = None
+
+
+_registry = TabRegistry()
+
+
+def get_tab_registry() -> TabRegistry:
+    return _registry
+
+
+def ensure_tabs(tab_headers: dict):
+    """
+    Make sure every tab in {tab_name: headers} exists, creating all the
+    missing ones (with header rows) in one batchUpdate.
+    """
+    requests = _registry.creation_requests(tab_headers)
+    if not requests:
+        return
+    try:
+        get_service().spreadsheets().batchUpdate(
+            spreadsheetId=SHEET_ID, body={"requests": requests}
+        ).execute()
+    except Exception:
+        # Another process may have created the tab meanwhile; reload next time
+        _registry.invalidate()
+        raise
+    _registry.mark_created(requests)
+    created = [r["addSheet"]["properties"]["title"] for r in requests if "addSheet" in r]
+    print(f"✅ Created tab(s) {created} with headers.")
+
+
 def ensure_tab_exists(tab_name: str, headers: list):
     """
     Check if the given tab exists in the spreadsheet.
     If not, create it and add the specified headers.
     """
     try:
-        sheet_metadata = service.spreadsheets().get(spreadsheetId=SHEET_ID).execute()
-        sheet_titles = [s["properties"]["title"] for s in sheet_metadata.get("sheets", [])]
-
-        # Create the tab if not present
-        if tab_name not in sheet_titles:
-            print(f"🧾 Creating new sheet tab: '{tab_name}' ...")
-            requests = [{
-                "addSheet": {"properties": {"title": tab_name}}
-            }]
-            service.spreadsheets().batchUpdate(
-                spreadsheetId=SHEET_ID, body={"requests": requests}
-            ).execute()
-
-            # Add header row
-            service.spreadsheets().values().update(
-                spreadsheetId=SHEET_ID,
-                range=f"{tab_name}!A1",
-                valueInputOption="RAW",
-                body={"values": [headers]}
-            ).execute()
-
-            print(f"✅ Created tab '{tab_name}' with headers: {headers}")
-        else:
-            print(f"✅ Tab '{tab_name}' already exists.")
+        ensure_tabs({tab_name: headers})
     except Exception as e:
         print(f"❌ Error checking or creating tab '{tab_name}': {e}")
 
@@ -100,26 +206,18 @@ def ensure_tab_exists(tab_name: str, headers: list):
 # 🧩 Milestone 2: Append AI-generated Content
 # ============================================================
 
-def update_sheet(sheet_name: str, data_row: list):
+def update_sheet(sheet_name: str, data_row: list, headers: list = None):
     """
     Appends a row (Topic, Generated Content, Optimized Content, Sentiment)
     to the 'AI_Optimization' tab.
     Automatically ensures tab and headers exist.
+    Rows go through the write-behind queue (see sheets_writer.py) and are
+    sent in batches; set SHEETS_WRITE_BEHIND=0 to write each row immediately.
     """
     try:
-        headers = ["Topic", "Generated Content", "Optimized Content", "Sentiment"]
-        ensure_tab_exists(sheet_name, headers)
-
-        body = {"values": [data_row]}
-        service.spreadsheets().values().append(
-            spreadsheetId=SHEET_ID,
-            range=f"{sheet_name}!A1",
-            valueInputOption="RAW",
-            insertDataOption="INSERT_ROWS",
-            body=body
-        ).execute()
-
-        print(f"📊 Added new row to '{sheet_name}': {data_row}")
+        headers = headers or ["Topic", "Generated Content", "Optimized Content", "Sentiment"]
+        _queue_row(sheet_name, data_row, headers)
+        print(f"📊 Queued new row for '{sheet_name}': {data_row}")
 
     except Exception as e:
         print(f"❌ Error appending row to '{sheet_name}': {e}")
@@ -136,18 +234,26 @@ def log_performance_metrics(data_row: list, sheet_name="PerformanceMetrics"):
     """
     try:
         headers = ["Date", "Topic", "Views", "Likes", "Shares"]
-        ensure_tab_exists(sheet_name, headers)
-
-        body = {"values": [data_row]}
-        service.spreadsheets().values().append(
-            spreadsheetId=SHEET_ID,
-            range=f"{sheet_name}!A1",
-            valueInputOption="RAW",
-            insertDataOption="INSERT_ROWS",
-            body=body
-        ).execute()
-
-        print(f"📈 Logged performance metrics to '{sheet_name}': {data_row}")
+        _queue_row(sheet_name, data_row, headers)
+        print(f"📈 Queued performance metrics for '{sheet_name}': {data_row}")
 
     except Exception as e:
         print(f"❌ Error logging performance metrics: {e}")
+
+
+def _queue_row(sheet_name, data_row, headers):
+    """Hand a row to the shared write-behind queue."""
+    from sheets_writer import get_sheet_writer
+
+    writer = get_sheet_writer()
+    writer.append(sheet_name, data_row, headers)
+    if os.getenv("SHEETS_WRITE_BEHIND", "1") == "0":
+        writer.flush()
+
+
+# ============================================================
+# 🧩 Manual Run: Upload sample data
+# ============================================================
+
+if __name__ == "__main__":
+    upload_csv_to_sheet("sample_data.csv")
@@ -0,0 +1,43 @@
+# ============================================================
+# 🤖 groq_client.py — Shared Groq Client & Call Helpers
+# Handles:
+#   - One lazily created Groq client per process
+#   - Blocking and streaming chat completions, both going through
+#     rate_limiter.call_with_retry (rate limits + retries)
+# Used by generate_content.py and optimize_content.py.
+# ============================================================
+
+import os
+from functools import lru_cache
+from dotenv import load_dotenv
+from rate_limiter import call_with_retry, estimate_tokens
+
+load_dotenv()
+
+
+# Initialize Groq client using API key from .env (on first use)
+@lru_cache(maxsize=1)
+def get_client():
+    from groq import Groq
+    # Retries are handled by rate_limiter.call_with_retry; GROQ_BASE_URL may point at a fake server
+    return Groq(api_key=os.getenv("GROQ_API_KEY"), max_retries=0)
+
+
+def complete(request):
+    """Send a chat completion request to Groq (rate-limited, with retries) and return the text."""
+    def call():
+        response = get_client().chat.completions.create(**request)
+        return response.choices[0].message.content.strip()
+    return call_with_retry(call, estimate_tokens(request))
+
+
+def stream(request):
+    """Open a streaming chat completion (rate-limited, with retries) and yield text deltas."""
+    chunks = call_with_retry(
+        lambda: get_client().chat.completions.create(**request, stream=True),
+        estimate_tokens(request)
+    )
+    for chunk in chunks:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            yield delta
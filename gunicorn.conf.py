@@ -0,0 +1,34 @@
+# ============================================================
+# 🦄 gunicorn.conf.py — Production Server Config for app.py
+# Usage:
+#   gunicorn -c gunicorn.conf.py
+# The app is built once in the master (preload_app) so the sentiment
+# model and Groq clients are loaded one time and shared copy-on-write
+# by every worker, instead of one model copy per worker.
+# ============================================================
+
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+
+wsgi_app = "app:create_app()"
+# GUNICORN_PRELOAD=0 loads the app (and model) separately in each worker
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") != "0"
+
+# Intra-op threads per worker; N workers x all cores would oversubscribe the CPU
+TORCH_THREADS = int(os.getenv("TORCH_THREADS_PER_WORKER", "1"))
+
+
+def when_ready(server):
+    server.log.info(f"🚀 Serving on {bind} with {workers} worker(s), preload_app={preload_app}")
+
+
+def post_fork(server, worker):
+    import sys
+    # Only touch torch if the master already imported it during warm-up
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(TORCH_THREADS)
+    # Job-queue threads and SQLite handles start lazily, so each worker gets its own
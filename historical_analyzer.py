@@ -0,0 +1,191 @@
+# ============================================================
+# 📚 historical_analyzer.py — Streaming Analyzer for Large Exports
+# Handles:
+#   - Reading CSV exports in chunks, only the needed columns, fixed dtypes
+#   - Incremental aggregates in bounded memory:
+#       per-topic post counts and mean engagement (top topics kept)
+#       engagement quantiles from a log-scale histogram sketch
+#       daily engagement over created_at, summarized as a trend
+# Works with reddit_data.csv (score + comments), sample_data.csv
+# (likes + retweets + replies) and PerformanceMetrics exports.
+# ============================================================
+
+import os
+import numpy as np
+import pandas as pd
+
+CHUNK_ROWS = int(os.getenv("HISTORY_CHUNK_ROWS", "50000"))
+MAX_TOPICS = int(os.getenv("HISTORY_MAX_TOPICS", "5000"))
+
+TEXT_COLUMNS = ["title", "text", "content"]
+TOPIC_COLUMNS = ["topic"]
+DATE_COLUMNS = ["created_at", "date"]
+ENGAGEMENT_COLUMNS = ["score", "comments", "like_count", "retweet_count", "reply_count", "likes", "shares"]
+
+STOPWORDS = {
+    "about", "after", "their", "there", "these", "those", "where", "which", "while",
+    "would", "could", "should", "other", "every", "being", "what's", "you're"
+}
+
+# Histogram over log1p(engagement): 0 .. ~1e9 in 400 bins (~5% wide each)
+SKETCH_BINS = np.linspace(0, np.log1p(1e9), 401)
+
+
+class QuantileSketch:
+    """Fixed-size log-scale histogram; quantiles accurate to one bin width."""
+
+    def __init__(self):
+        self.counts = np.zeros(len(SKETCH_BINS) - 1, dtype=np.int64)
+
+    def add(self, values):
+        logs = np.log1p(np.clip(values, 0, None))
+        idx = np.clip(np.searchsorted(SKETCH_BINS, logs, side="right") - 1, 0, len(self.counts) - 1)
+        self.counts += np.bincount(idx, minlength=len(self.counts))
+
+    def quantile(self, q):
+        total = self.counts.sum()
+        if total == 0:
+            return 0.0
+        i = int(np.searchsorted(np.cumsum(self.counts), q * total))
+        # Midpoint of the bin, back on the original scale
+        return float(np.expm1((SKETCH_BINS[i] + SKETCH_BINS[i + 1]) / 2))
+
+
+class HistoricalAnalyzer:
+    """Accumulates aggregates chunk by chunk; memory stays bounded by MAX_TOPICS and the day count."""
+
+    def __init__(self, max_topics=MAX_TOPICS):
+        self.max_topics = max_topics
+        self.rows = 0
+        self.score_sum = 0.0
+        self.score_rows = 0
+        self.engagement_sum = 0.0
+        self.topics = {}        # topic → [posts, engagement sum]
+        self.days = {}          # day (UTC midnight) → [posts, engagement sum]
+        self.sketch = QuantileSketch()
+
+    # --------------------------------------------------------
+    # Per-chunk updates
+    # --------------------------------------------------------
+
+    def _topics(self, chunk, columns):
+        """Topic labels per row: a topic column, else hashtags, else leading keywords."""
+        if columns["topic"]:
+            return chunk[columns["topic"]].fillna("").str.strip().str.lower().map(lambda t: [t] if t else [])
+        if not columns["text"]:
+            return None
+        text = chunk[columns["text"]].fillna("").str.lower()
+        topics = text.str.findall(r"#\w+")
+        # Keywords only for the rows without hashtags
+        missing = topics.str.len() == 0
+        topics[missing] = text[missing].str.findall(r"[a-z][a-z']{4,}").map(
+            lambda words: [w for w in dict.fromkeys(words) if w not in STOPWORDS][:3]
+        )
+        return topics
+
+    def _prune_topics(self):
+        # Keep the most-posted half once the table is full (lossy counting)
+        if len(self.topics) > self.max_topics:
+            keep = sorted(self.topics.items(), key=lambda kv: kv[1][0], reverse=True)[:self.max_topics // 2]
+            self.topics = dict(keep)
+
+    def add_chunk(self, chunk, columns):
+        engagement = chunk[columns["engagement"]].fillna(0).sum(axis=1).to_numpy(float)
+        self.rows += len(chunk)
+        self.engagement_sum += float(engagement.sum())
+        self.sketch.add(engagement)
+
+        if columns["score"]:
+            scores = chunk[columns["score"]].dropna()
+            self.score_sum += float(scores.sum())
+            self.score_rows += len(scores)
+
+        topics = self._topics(chunk, columns)
+        if topics is not None:
+            per_topic = pd.DataFrame({"topic": topics.to_numpy(), "engagement": engagement}).explode("topic").dropna()
+            grouped = per_topic.groupby("topic")["engagement"].agg(["count", "sum"])
+            for topic, (count, total) in zip(grouped.index, grouped.to_numpy()):
+                entry = self.topics.setdefault(topic, [0, 0.0])
+                entry[0] += int(count)
+                entry[1] += float(total)
+            self._prune_topics()
+
+        if columns["date"]:
+            dates = pd.to_datetime(chunk[columns["date"]], utc=True, errors="coerce", format="ISO8601")
+            days = pd.DataFrame({"day": dates.dt.floor("D"), "engagement": engagement}).dropna()
+            grouped = days.groupby("day")["engagement"].agg(["count", "sum"])
+            for day, (count, total) in zip(grouped.index, grouped.to_numpy()):
+                entry = self.days.setdefault(day, [0, 0.0])
+                entry[0] += int(count)
+                entry[1] += float(total)
+
+    # --------------------------------------------------------
+    # Results
+    # --------------------------------------------------------
+
+    def best_topics(self, limit=5, min_posts=2):
+        ranked = [
+            {"topic": topic, "posts": posts, "avg_engagement": round(total / posts, 2)}
+            for topic, (posts, total) in self.topics.items() if posts >= min_posts
+        ]
+        ranked.sort(key=lambda t: (t["avg_engagement"], t["posts"]), reverse=True)
+        return ranked[:limit]
+
+    def trend(self):
+        """'rising', 'declining' or 'stable', from a least-squares slope over daily mean engagement."""
+        if len(self.days) < 2:
+            return "stable"
+        days = sorted(self.days)
+        x = np.array([(day - days[0]).days for day in days], dtype=float)
+        y = np.array([self.days[d][1] / self.days[d][0] for d in days])
+        if x[-1] == 0 or y.mean() == 0:
+            return "stable"
+        slope = np.polyfit(x, y, 1)[0]
+        # Relative change across the whole period
+        change = slope * x[-1] / y.mean()
+        if change > 0.1:
+            return "rising"
+        if change < -0.1:
+            return "declining"
+        return "stable"
+
+    def insights(self):
+        mean_engagement = self.engagement_sum / self.rows if self.rows else 0
+        return {
+            "total_campaigns": self.rows,
+            # Mean score when the export has one (Reddit), else mean total engagement
+            "avg_engagement": self.score_sum / self.score_rows if self.score_rows else mean_engagement,
+            "best_performing_topics": self.best_topics(),
+            "engagement_trends": self.trend(),
+            "engagement_quantiles": {
+                f"p{int(q * 100)}": round(self.sketch.quantile(q), 1) for q in (0.5, 0.9, 0.99)
+            },
+            "days_covered": len(self.days)
+        }
+
+
+def detect_columns(csv_file):
+    """Pick the text, topic, date and engagement columns present in an export (header only)."""
+    header = {c.lower(): c for c in pd.read_csv(csv_file, nrows=0).columns}
+    pick = lambda names: next((header[n] for n in names if n in header), None)
+    return {
+        "text": pick(TEXT_COLUMNS),
+        "topic": pick(TOPIC_COLUMNS),
+        "date": pick(DATE_COLUMNS),
+        "score": pick(["score"]),
+        "engagement": [header[n] for n in ENGAGEMENT_COLUMNS if n in header],
+    }
+
+
+def analyze_csv(csv_file, chunk_rows=CHUNK_ROWS):
+    """Stream an export through HistoricalAnalyzer; returns the insights dict."""
+    columns = detect_columns(csv_file)
+    dtypes = {c: "float64" for c in columns["engagement"]}
+    for key in ("text", "topic", "date"):
+        if columns[key]:
+            dtypes[columns[key]] = "object"
+
+    analyzer = HistoricalAnalyzer()
+    for chunk in pd.read_csv(csv_file, usecols=list(dtypes), dtype=dtypes, chunksize=chunk_rows):
+        analyzer.add_chunk(chunk, columns)
+    return analyzer.insights()
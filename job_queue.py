@@ -0,0 +1,257 @@
+# ============================================================
+# 📬 job_queue.py — Persistent Background Job Queue (SQLite)
+# Handles:
+#   - Submitting long-running work (A/B tests, predictions) as jobs
+#   - JOB_WORKERS worker threads per process, and at most JOB_MAX_RUNNING
+#     jobs running at once across every process sharing the database
+#   - Rejecting new jobs once JOB_MAX_PENDING are waiting (QueueFull)
+#   - Polling job status/results by id
+#   - Jobs surviving restarts: queued jobs are picked up again, and
+#     running jobs whose owner stopped heartbeating are requeued
+# Several processes (e.g. gunicorn workers) can share one database;
+# each job is claimed by exactly one of them.
+# ============================================================
+
+import os
+import json
+import socket
+import time
+import uuid
+import sqlite3
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", ".jobs.sqlite")
+# Worker threads per process (each gunicorn worker starts its own)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+# Global cap on running jobs, enforced in the database claim
+JOB_MAX_RUNNING = int(os.getenv("JOB_MAX_RUNNING", str(JOB_WORKERS)))
+JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", "50"))
+# Owners refresh their running jobs' heartbeat this often; a job whose
+# heartbeat is older than JOB_STALE_SECONDS is assumed orphaned and requeued
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "10"))
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "60"))
+
+
+class QueueFull(RuntimeError):
+    """Raised by submit() when JOB_MAX_PENDING jobs are already waiting."""
+
+
+def _to_json(value):
+    return json.dumps(value, ensure_ascii=False, default=lambda o: o.item() if hasattr(o, "item") else str(o))
+
+
+class JobQueue:
+    """SQLite-backed job table plus a lazily started pool of worker threads."""
+
+    def __init__(self, path=JOB_DB_PATH, workers=JOB_WORKERS, max_pending=JOB_MAX_PENDING,
+                 max_running=JOB_MAX_RUNNING):
+        self.path = path
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_running = max_running
+        self.handlers = {}      # kind → callable(params) → JSON-serializable result
+        self._local = threading.local()
+        self._wake = threading.Event()
+        self._start_lock = threading.Lock()
+        self._threads = []
+        self._pid = None
+        self.owner = None       # host:pid:nonce of this process, stamped on the jobs it claims
+
+    # --------------------------------------------------------
+    # Storage
+    # --------------------------------------------------------
+
+    def _db(self):
+        # One connection per thread; WAL lets readers poll while a worker writes
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, kind TEXT NOT NULL, params TEXT NOT NULL, "
+                "status TEXT NOT NULL, result TEXT, error TEXT, "
+                "created_at REAL NOT NULL, started_at REAL, finished_at REAL, "
+                "owner TEXT, heartbeat_at REAL)"
+            )
+            # Databases created before the heartbeat columns existed
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, kind in (("owner", "TEXT"), ("heartbeat_at", "REAL")):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+            self._local.conn = conn
+        return conn
+
+    def register(self, kind, handler):
+        """Declare the function that runs jobs of this kind."""
+        self.handlers[kind] = handler
+        return handler
+
+    def submit(self, kind, params):
+        """Queue a job and return its id. Raises QueueFull when the backlog is at its limit."""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        self._ensure_workers()
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            (pending,) = db.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()
+            if pending >= self.max_pending:
+                raise QueueFull(f"{pending} jobs already queued (limit {self.max_pending})")
+            job_id = uuid.uuid4().hex
+            db.execute(
+                "INSERT INTO jobs (id, kind, params, status, created_at) VALUES (?, ?, ?, 'queued', ?)",
+                (job_id, kind, _to_json(params), time.time())
+            )
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        self._wake.set()
+        return job_id
+
+    def get(self, job_id):
+        """Status dict for a job, or None if the id is unknown."""
+        self._ensure_workers()
+        row = self._db().execute(
+            "SELECT id, kind, status, result, error, created_at, started_at, finished_at "
+            "FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        job_id, kind, status, result, error, created_at, started_at, finished_at = row
+        job = {"id": job_id, "kind": kind, "status": status, "created_at": created_at}
+        if status == "queued":
+            (ahead,) = self._db().execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created_at < ?", (created_at,)
+            ).fetchone()
+            job["position"] = ahead + 1
+        if started_at:
+            job["started_at"] = started_at
+        if finished_at:
+            job["finished_at"] = finished_at
+            job["seconds"] = round(finished_at - started_at, 2)
+        if result is not None:
+            job["result"] = json.loads(result)
+        if error is not None:
+            job["error"] = error
+        return job
+
+    def _requeue_stale(self, db):
+        """Requeue running jobs whose owner stopped heartbeating (crashed or killed)."""
+        requeued = db.execute(
+            "UPDATE jobs SET status = 'queued', started_at = NULL, owner = NULL, heartbeat_at = NULL "
+            "WHERE status = 'running' AND COALESCE(heartbeat_at, started_at) < ?",
+            (time.time() - JOB_STALE_SECONDS,)
+        ).rowcount
+        if requeued:
+            print(f"♻️ Requeued {requeued} job(s) abandoned by a dead worker.")
+
+    def _claim(self):
+        """
+        Atomically move the oldest queued job to running, unless max_running
+        jobs are already running across all processes. Returns (id, kind, params) or None.
+        """
+        db = self._db()
+        # The write lock makes count + claim one step for every process on the database
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            self._requeue_stale(db)
+            (running,) = db.execute("SELECT COUNT(*) FROM jobs WHERE status = 'running'").fetchone()
+            row = None
+            if running < self.max_running:
+                row = db.execute(
+                    "SELECT id, kind, params FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+                ).fetchone()
+            if row is not None:
+                now = time.time()
+                db.execute(
+                    "UPDATE jobs SET status = 'running', started_at = ?, owner = ?, heartbeat_at = ? WHERE id = ?",
+                    (now, self.owner, now, row[0])
+                )
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        return None if row is None else (row[0], row[1], json.loads(row[2]))
+
+    def _finish(self, job_id, result=None, error=None):
+        # Only the current owner records the outcome; a requeued job belongs to its new claimer
+        self._db().execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? "
+            "WHERE id = ? AND owner = ? AND status = 'running'",
+            ("failed" if error else "done", None if error else _to_json(result), error, time.time(),
+             job_id, self.owner)
+        )
+        # A slot freed up: let an idle worker claim the next job right away
+        self._wake.set()
+
+    def _heartbeat(self):
+        while True:
+            time.sleep(JOB_HEARTBEAT_SECONDS)
+            try:
+                self._db().execute(
+                    "UPDATE jobs SET heartbeat_at = ? WHERE owner = ? AND status = 'running'",
+                    (time.time(), self.owner)
+                )
+            except sqlite3.Error as e:
+                print(f"⚠️ Job heartbeat failed: {e}")
+
+    # --------------------------------------------------------
+    # Workers
+    # --------------------------------------------------------
+
+    def _ensure_workers(self):
+        # Started on first use (not import) so forked server workers each get their own threads
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self.owner = f"{socket.gethostname()}:{self._pid}:{uuid.uuid4().hex[:8]}"
+            # SQLite connections must not cross a fork
+            self._local = threading.local()
+            self._threads = [
+                threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            self._threads.append(threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True))
+            for t in self._threads:
+                t.start()
+            print(f"📬 Job queue started with {self.workers} worker(s) (pid {self._pid}, "
+                  f"{self.max_running} running at most across processes).")
+
+    def _run(self):
+        while True:
+            job = self._claim()
+            if job is None:
+                # Also poll, to pick up jobs submitted by other processes
+                self._wake.wait(1.0)
+                self._wake.clear()
+                continue
+            job_id, kind, params = job
+            try:
+                self._finish(job_id, result=self.handlers[kind](params))
+            except Exception as e:
+                print(f"❌ Job {job_id} ({kind}) failed: {e}")
+                self._finish(job_id, error=str(e))
+
+    def stats(self):
+        rows = self._db().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Return the process-wide job queue."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
@@ -0,0 +1,171 @@
+# ============================================================
+# 🗃️ llm_cache.py — Persistent LLM Response Cache
+# Handles:
+#   - SQLite store keyed on model, prompt, temperature and max_tokens,
+#     plus an optional variant label so sampled (temperature > 0)
+#     requests that must differ, like A/B variants, get separate entries
+#   - TTL expiry and a size bound (least recently used entries evicted)
+#   - Modes ($LLM_CACHE_MODE):
+#       on     → serve fresh hits, call the API on misses (default)
+#       off    → always call the API
+#       replay → serve any stored response, never call the API
+#                (deterministic, offline runs for tests and benchmarks)
+# ============================================================
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".llm_cache.sqlite")
+TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+MODES = ("on", "off", "replay")
+
+
+class ReplayMiss(LookupError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+def request_key(request, variant=None):
+    """
+    Stable hash of the fields that determine a completion. `variant` separates
+    otherwise identical sampled requests; None keeps the plain request key.
+    """
+    fields = {k: request.get(k) for k in ("model", "messages", "temperature", "max_tokens")}
+    if variant is not None and request.get("temperature"):
+        fields["variant"] = str(variant)
+    payload = json.dumps(fields, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Size-bounded SQLite store of completion texts with a TTL."""
+
+    def __init__(self, path=CACHE_PATH, ttl=TTL_SECONDS, max_entries=MAX_ENTRIES, mode=None):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.mode = mode or os.getenv("LLM_CACHE_MODE", "on")
+        if self.mode not in MODES:
+            print(f"⚠️ Unknown LLM_CACHE_MODE '{self.mode}', using 'on'.")
+            self.mode = "on"
+        self._lock = threading.Lock()
+        self._conn = None
+        self.stats = {"hits": 0, "misses": 0, "expired": 0}
+
+    def _db(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, content TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key):
+        """Return the stored text, or None when missing or expired (replay ignores the TTL)."""
+        with self._lock:
+            row = self._db().execute(
+                "SELECT content, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            content, created_at = row
+            if self.mode != "replay" and time.time() - created_at > self.ttl:
+                self.stats["expired"] += 1
+                return None
+            self._db().execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._db().commit()
+            self.stats["hits"] += 1
+            return content
+
+    def put(self, key, content):
+        """Store a response, then trim the table to max_entries by least recent access."""
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO responses (key, content, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, content, now, now)
+            )
+            db.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            db.commit()
+
+
+_cache = None
+
+
+def get_llm_cache():
+    """Return the process-wide LLM response cache."""
+    global _cache
+    if _cache is None:
+        _cache = LLMCache()
+    return _cache
+
+
+def cached_completion(request, create, variant=None):
+    """
+    Return the completion text for a chat request, using the cache per its mode.
+    request: dict with model, messages, temperature, max_tokens.
+    create:  callable(request) → text, used on a cache miss.
+    variant: label for one of several samples of the same request (e.g. an
+             A/B variant id); each label is cached separately.
+    """
+    cache = get_llm_cache()
+    if cache.mode == "off":
+        return create(request)
+
+    key = request_key(request, variant)
+    content = cache.get(key)
+    if content is not None:
+        print("⚡ Served completion from LLM cache.")
+        return content
+
+    if cache.mode == "replay":
+        raise ReplayMiss(f"No recorded completion for request {key[:12]}… (LLM_CACHE_MODE=replay)")
+
+    content = create(request)
+    cache.put(key, content)
+    return content
+
+
+def cached_stream(request, stream, variant=None):
+    """
+    Streaming counterpart of cached_completion.
+    stream: callable(request) → iterator of text deltas, used on a cache miss.
+    A hit yields the stored text once; a completed miss is stored for next time.
+    """
+    cache = get_llm_cache()
+    if cache.mode == "off":
+        yield from stream(request)
+        return
+
+    key = request_key(request, variant)
+    content = cache.get(key)
+    if content is not None:
+        print("⚡ Served completion from LLM cache.")
+        yield content
+        return
+
+    if cache.mode == "replay":
+        raise ReplayMiss(f"No recorded completion for request {key[:12]}… (LLM_CACHE_MODE=replay)")
+
+    parts = []
+    for delta in stream(request):
+        parts.append(delta)
+        yield delta
+    # Only fully received responses are cached; an interrupted stream stores nothing
+    cache.put(key, "".join(parts).strip())
@@ -2,67 +2,245 @@
 # 🤖 main_content_engine.py — Milestone 3: Integrated AI Engine
 # ============================================================
 
+import os
+import time
+import argparse
 from generate_content import generate_marketing_content
 from optimize_content import optimize_content
 from trend_analysis import fetch_trending_topics
-from sentiment_analysis import analyze_sentiment
+from sentiment_analysis import analyze_sentiment, analyze_sentiment_batch
 from performance_metrics import generate_performance_metrics, log_performance_metrics
 from google_sheets_example import update_sheet
-from slack_notify import send_slack_alert, send_performance_alert
+from sheets_writer import flush_sheets
+from slack_notify import send_slack_alert, send_performance_alert, slack_digest
+from stage_pipeline import Stage, StagePipeline
+from step_dag import StepDAG
+from checkpoint_store import get_checkpoint_store
 
 # ============================================================
 # 🧩 Main Pipeline Function
 # ============================================================
 
+# Steps that write to Sheets or Slack are never checkpointed: they are only
+# queued (write-behind / background delivery) when the step returns, so a
+# resumed run repeats them rather than risk skipping a write that never landed
+SIDE_EFFECT_STEPS = {"log_content", "log_metrics", "slack"}
+
 def run_content_generation(topic):
+    """
+    Run the eight pipeline steps for one topic. Steps are declared with their
+    inputs and run concurrently where they don't depend on each other, so
+    latency follows the critical path (generate → optimize → sentiment → log).
+    Each finished step (except the side effects) is checkpointed; rerunning
+    a topic after a failure resumes from the steps that did not complete.
+    """
+    store = get_checkpoint_store()
+    run_key = store.claim(f"content:{topic}")
+    try:
+        return _run_content_steps(topic, store, run_key)
+    finally:
+        store.release(run_key)
+
+
+def _run_content_steps(topic, store, run_key):
+    done = {name: value for name, value in store.load(run_key).items() if name not in SIDE_EFFECT_STEPS}
+    if done:
+        print(f"♻️ Resuming '{topic}': {len(done)} step(s) restored from checkpoint ({', '.join(done)})")
+
     # --- Step 1: Generate Base Content ---
-    print("🚀 Generating content...")
-    base = generate_marketing_content(topic)
-    print("✅ Base content generated:\n", base)
+    def generate_base():
+        print("🚀 Generating content...")
+        base = generate_marketing_content(topic)
+        print("✅ Base content generated:\n", base)
+        return base
 
     # --- Step 2: Fetch Trending Topics ---
-    print("\n📊 Fetching trending topics...")
-    trends = fetch_trending_topics()
-    print("✅ Trends fetched:", trends)
+    def fetch_trends():
+        print("\n📊 Fetching trending topics...")
+        trends = fetch_trending_topics()
+        print("✅ Trends fetched:", trends)
+        return trends
 
     # --- Step 3: Optimize Content ---
-    print("\n✨ Optimizing content...")
-    optimized = optimize_content(base, trends)
-    print("✅ Optimized content:\n", optimized)
+    def optimize(base, trends):
+        print("\n✨ Optimizing content...")
+        optimized = optimize_content(base, trends)
+        print("✅ Optimized content:\n", optimized)
+        return optimized
 
     # --- Step 4: Sentiment Analysis ---
-    print("\n🧠 Analyzing sentiment of optimized content...")
-    sentiment = analyze_sentiment(optimized)
-    print(f"✅ Sentiment detected: {sentiment}")
+    def score_sentiment(optimized):
+        print("\n🧠 Analyzing sentiment of optimized content...")
+        sentiment = analyze_sentiment(optimized)
+        print(f"✅ Sentiment detected: {sentiment}")
+        return sentiment
 
     # --- Step 5: Log to Google Sheets (AI Optimization Tab) ---
-    print("\n🗂️ Updating Google Sheet with content and sentiment...")
-    update_sheet("AI_Optimization", [topic, base, optimized, sentiment])
-    print("✅ Content + Sentiment logged successfully.")
+    def log_content(base, optimized, sentiment):
+        print("\n🗂️ Updating Google Sheet with content and sentiment...")
+        update_sheet("AI_Optimization", [topic, base, optimized, sentiment])
+        print("✅ Content + Sentiment logged successfully.")
 
     # --- Step 6: Simulate Performance Metrics ---
-    print("\n📈 Generating simulated performance metrics...")
-    metrics = generate_performance_metrics(topic)
-    print("✅ Metrics generated:", metrics)
+    def simulate_metrics():
+        print("\n📈 Generating simulated performance metrics...")
+        metrics = generate_performance_metrics(topic)
+        print("✅ Metrics generated:", metrics)
+        return metrics
 
     # --- Step 7: Log Metrics to Google Sheets (Performance Tab) ---
-    log_performance_metrics([
-        metrics["Date"],
-        metrics["Topic"],
-        metrics["Views"],
-        metrics["Likes"],
-        metrics["Shares"]
-    ])
-    print("✅ Metrics logged successfully in PerformanceMetrics tab.")
+    def log_metrics(metrics):
+        log_performance_metrics([
+            metrics["Date"],
+            metrics["Topic"],
+            metrics["Views"],
+            metrics["Likes"],
+            metrics["Shares"]
+        ])
+        print("✅ Metrics logged successfully in PerformanceMetrics tab.")
 
     # --- Step 8: Send Slack Alerts ---
-    print("\n💬 Sending Slack notifications...")
-    send_slack_alert(f"✅ New optimized content generated for *{topic}* (Sentiment: {sentiment})\n\n{optimized}")
-    send_performance_alert(metrics)
-    print("✅ Slack alerts sent successfully!")
+    def notify(optimized, sentiment, metrics):
+        print("\n💬 Sending Slack notifications...")
+        send_slack_alert(f"✅ New optimized content generated for *{topic}* (Sentiment: {sentiment})\n\n{optimized}", topic=topic)
+        send_performance_alert(metrics)
+        print("✅ Slack alerts sent successfully!")
+
+    dag = (
+        StepDAG()
+        .add("base", generate_base)
+        .add("trends", fetch_trends)
+        .add("optimized", optimize, deps=("base", "trends"))
+        .add("sentiment", score_sentiment, deps=("optimized",))
+        .add("log_content", log_content, deps=("base", "optimized", "sentiment"))
+        .add("metrics", simulate_metrics)
+        .add("log_metrics", log_metrics, deps=("metrics",))
+        .add("slack", notify, deps=("optimized", "sentiment", "metrics"))
+    )
+    def checkpoint(name, value):
+        if name not in SIDE_EFFECT_STEPS:
+            store.save(run_key, name, value)
 
+    results = dag.run(done=done, on_result=checkpoint)
+    store.clear(run_key)
+
+    print("\n⏱️ Step timings:\n" + dag.format_trace())
     print("\n🎯 Milestone 3 pipeline completed for topic:", topic)
-    return optimized
+    return results["optimized"]
+
+
+# ============================================================
+# 🧩 Batch Mode: many topics through a concurrent stage pipeline
+# ============================================================
+
+# Threads per stage; generation and optimization wait on the Groq API,
+# sentiment runs micro-batches through the model on one thread
+BATCH_WORKERS = {
+    "generate": int(os.getenv("BATCH_GENERATE_WORKERS", "4")),
+    "optimize": int(os.getenv("BATCH_OPTIMIZE_WORKERS", "4")),
+    "sentiment": 1,
+    "metrics": 1,
+    "sink": 1
+}
+BATCH_QUEUE_SIZE = int(os.getenv("BATCH_QUEUE_SIZE", "16"))
+SENTIMENT_BATCH_SIZE = 32
+
+
+def load_topics(path):
+    """Read topics from a text file, one per line (blank lines and # comments skipped)."""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+def run_content_batch(topics, workers=None, queue_size=BATCH_QUEUE_SIZE):
+    """
+    Run the Milestone 3 pipeline for many topics at once:
+        generate → optimize → sentiment → metrics → sink
+    Trends are fetched once for the whole batch, sheet rows go through the
+    write-behind queue and Slack alerts are collapsed into a digest.
+    Each topic's finished stages are checkpointed under the same key and step
+    names as run_content_generation, so rerunning a batch after a failure
+    skips the work that already completed (the sink always runs again).
+    Returns one result dict per topic (with an "error" key if a stage failed).
+    """
+    workers = dict(BATCH_WORKERS, **(workers or {}))
+    started = time.monotonic()
+    store = get_checkpoint_store()
+
+    print(f"📊 Fetching trending topics once for {len(topics)} topic(s)...")
+    trends = fetch_trending_topics()
+
+    def checkpointed(item, step, compute):
+        if step in item:
+            print(f"♻️ Resuming '{item['topic']}': step '{step}' restored from checkpoint.")
+            return
+        item[step] = compute()
+        store.save(item["run_key"], step, item[step])
+
+    def generate(item):
+        checkpointed(item, "base", lambda: generate_marketing_content(item["topic"]))
+
+    def optimize(item):
+        checkpointed(item, "optimized", lambda: optimize_content(item["base"], trends))
+
+    def sentiment(items):
+        pending = [item for item in items if "sentiment" not in item]
+        results = analyze_sentiment_batch([item["optimized"] for item in pending]) if pending else []
+        for item, result in zip(pending, results):
+            item["sentiment"] = result["sentiment"]
+            # Score 0.0 is the Neutral fallback for a failed batch; the sink still
+            # uses it, but a rerun scores the text again instead of restoring it
+            if result["score"] > 0:
+                store.save(item["run_key"], "sentiment", item["sentiment"])
+
+    def metrics(item):
+        checkpointed(item, "metrics", lambda: generate_performance_metrics(item["topic"]))
+
+    def sink(item):
+        m = item["metrics"]
+        update_sheet("AI_Optimization", [item["topic"], item["base"], item["optimized"], item["sentiment"]])
+        log_performance_metrics([m["Date"], m["Topic"], m["Views"], m["Likes"], m["Shares"]])
+        send_slack_alert(
+            f"✅ New optimized content generated for *{item['topic']}* "
+            f"(Sentiment: {item['sentiment']})\n\n{item['optimized']}",
+            topic=item["topic"]
+        )
+        send_performance_alert(m)
+
+    pipeline = StagePipeline([
+        Stage("generate", generate, workers["generate"]),
+        Stage("optimize", optimize, workers["optimize"]),
+        Stage("sentiment", sentiment, workers["sentiment"], batch_size=SENTIMENT_BATCH_SIZE),
+        Stage("metrics", metrics, workers["metrics"]),
+        Stage("sink", sink, workers["sink"])
+    ], queue_size=queue_size)
+
+    claimed = []
+
+    def start(topic):
+        run_key = store.claim(f"content:{topic}")
+        claimed.append(run_key)
+        restored = {step: value for step, value in store.load(run_key).items()
+                    if step in ("base", "optimized", "sentiment", "metrics")}
+        return dict(restored, topic=topic, run_key=run_key)
+
+    try:
+        with slack_digest():
+            results = pipeline.run(start(topic) for topic in topics)
+        flush_sheets()
+        for item in results:
+            if "error" not in item:
+                store.clear(item["run_key"])
+    finally:
+        for run_key in claimed:
+            store.release(run_key)
+
+    elapsed = time.monotonic() - started
+    failed = sum(1 for r in results if "error" in r)
+    print(f"\n🎯 Batch completed: {len(results) - failed}/{len(results)} topic(s) in {elapsed:.1f}s "
+          f"({len(results) / elapsed * 3600 if elapsed else 0:.0f} topics/hour)")
+    print(f"📈 Stage report: {pipeline.report()}")
+    return results
 
 
 # ============================================================
@@ -70,5 +248,12 @@ def run_content_generation(topic):
 # ============================================================
 
 if __name__ == "__main__":
-    topic = input("📝 Enter a topic for content generation: ")
-    run_content_generation(topic)
+    parser = argparse.ArgumentParser(description="AI content generation engine")
+    parser.add_argument("--batch", metavar="FILE", help="run every topic in FILE (one per line)")
+    args = parser.parse_args()
+
+    if args.batch:
+        run_content_batch(load_topics(args.batch))
+    else:
+        topic = input("📝 Enter a topic for content generation: ")
+        run_content_generation(topic)
@@ -2,21 +2,17 @@
 # ✨ optimize_content.py — Groq LLaMA-3.1 Integration (Optimized)
 # ============================================================
 
-import os
 from dotenv import load_dotenv
-from groq import Groq
+from llm_cache import cached_completion, cached_stream
+# Groq client and rate-limited call helpers, shared with generate_content
+from groq_client import complete, stream
 
 # Load environment variables
 load_dotenv()
 
-# Initialize Groq client
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
 
-def optimize_content(base_content, trending_topics):
-    """
-    Optimize generated marketing content using Groq’s LLaMA-3.1-8B-Instant model.
-    Adds trending topics, improves tone and engagement, and enhances readability.
-    """
+def build_request(base_content, trending_topics):
+    """Chat request for the optimization prompt; shared by the blocking and streaming paths."""
 
     # Convert the trending topics list into a readable string
     trends = ", ".join(trending_topics)
@@ -40,19 +36,33 @@ def optimize_content(base_content, trending_topics):
     Optimized Version:
     """
 
-    print("✨ Optimizing content using Groq LLaMA-3.1 …")
-
-    # Call Groq’s chat completion endpoint
-    response = client.chat.completions.create(
-        model="llama-3.1-8b-instant",   # ✅ Supported Groq model
-        messages=[
+    return {
+        "model": "llama-3.1-8b-instant",   # ✅ Supported Groq model
+        "messages": [
             {"role": "system", "content": "You are a marketing content optimization expert."},
             {"role": "user", "content": prompt}
         ],
-        temperature=0.7,
-        max_tokens=250
-    )
+        "temperature": 0.7,
+        "max_tokens": 250
+    }
+
+def optimize_content(base_content, trending_topics):
+    """
+    Optimize generated marketing content using Groq’s LLaMA-3.1-8B-Instant model.
+    Adds trending topics, improves tone and engagement, and enhances readability.
+    """
+    print("✨ Optimizing content using Groq LLaMA-3.1 …")
 
-    optimized_text = response.choices[0].message.content.strip()
+    # Call Groq’s chat completion endpoint (identical prompts hit the response cache)
+    optimized_text = cached_completion(build_request(base_content, trending_topics), complete)
     print("✅ Optimization complete.")
     return optimized_text
+
+
+def stream_optimized_content(base_content, trending_topics):
+    """
+    Same as optimize_content, but yields text as tokens arrive.
+    A cached response is yielded in one piece.
+    """
+    print("✨ Streaming optimization from Groq LLaMA-3.1 …")
+    yield from cached_stream(build_request(base_content, trending_topics), stream)
@@ -2,11 +2,10 @@
 # 🔮 prediction_coach.py — Predictive Analytics & Recommendations
 # ============================================================
 
-import pandas as pd
 import random
 from datetime import datetime, timedelta
 from performance_metrics import generate_performance_metrics
-from sentiment_analysis import analyze_sentiment
+from sentiment_analysis import analyze_sentiment, analyze_sentiment_batch
 from trend_analysis import fetch_trending_topics
 
 # ============================================================
@@ -19,17 +18,13 @@ def analyze_historical_performance(csv_file="reddit_data.csv"):
     Returns insights and predictions based on past campaigns.
     """
     try:
-        df = pd.read_csv(csv_file)
-        print(f"📊 Analyzing {len(df)} historical records...")
-        
-        insights = {
-            "total_campaigns": len(df),
-            "avg_engagement": df.get("score", pd.Series([0])).mean() if "score" in df.columns else 0,
-            "best_performing_topics": [],
-            "engagement_trends": "stable"
-        }
+        from historical_analyzer import analyze_csv
+
+        # Streamed in chunks, so multi-GB exports run in bounded memory
+        print(f"📊 Analyzing historical records in {csv_file}...")
+        insights = analyze_csv(csv_file)
         
-        print(f"✅ Historical analysis complete")
+        print(f"✅ Historical analysis complete ({insights['total_campaigns']} records)")
         return insights
     except Exception as e:
         print(f"⚠️ Could not analyze historical data: {e}")
@@ -40,31 +35,52 @@ def analyze_historical_performance(csv_file="reddit_data.csv"):
 # 🔹 Content Performance Predictor
 # ============================================================
 
-def predict_content_performance(content, platform="twitter"):
+def predict_content_performance(content, platform="twitter", sentiment=None):
     """
     Predict how content will perform based on multiple factors.
+    Pass a precomputed sentiment to skip the transformer call.
+    Metrics come from the factor heuristic; when a trained engagement model
+    is available its estimate is added as `expected_engagement`.
     Returns predicted metrics and confidence score.
     """
+    from content_features import has_cta
+
     print(f"\n🔮 Predicting performance for {platform} content...")
     
+    if sentiment is None:
+        sentiment = analyze_sentiment(content)
+    
+    engagement = expected_engagement([content], platform)
+    return build_prediction(
+        sentiment,
+        word_count=len(content.split()),
+        hashtag_count=content.count("#"),
+        has_emoji=any(char for char in content if ord(char) > 127),
+        has_cta=has_cta(content),
+        expected=None if engagement is None else float(engagement[0])
+    )
+
+
+def build_prediction(sentiment, word_count, hashtag_count, has_emoji, has_cta, expected=None):
+    """
+    Turn extracted content features into predicted metrics.
+    Shared by the single-content and batch predictors.
+    expected: the engagement model's expected interactions (likes + shares +
+    replies, or score + comments), reported alongside the heuristic metrics.
+    """
     # Factor 1: Sentiment analysis
-    sentiment = analyze_sentiment(content)
     sentiment_score = {"Positive": 1.3, "Neutral": 1.0, "Negative": 0.7}[sentiment]
     
     # Factor 2: Content length
-    word_count = len(content.split())
     length_score = 1.2 if 15 <= word_count <= 30 else 0.9
     
     # Factor 3: Hashtag presence
-    hashtag_count = content.count("#")
     hashtag_score = min(1.0 + (hashtag_count * 0.1), 1.3)
     
     # Factor 4: Emoji presence
-    emoji_score = 1.15 if any(char for char in content if ord(char) > 127) else 1.0
+    emoji_score = 1.15 if has_emoji else 1.0
     
     # Factor 5: Call-to-action detection
-    cta_keywords = ["click", "learn", "discover", "join", "get", "try", "download"]
-    has_cta = any(keyword in content.lower() for keyword in cta_keywords)
     cta_score = 1.2 if has_cta else 1.0
     
     # Calculate composite prediction
@@ -94,10 +110,64 @@ def predict_content_performance(content, platform="twitter"):
             "has_cta": has_cta
         }
     }
+    if expected is not None:
+        prediction["expected_engagement"] = round(expected, 1)
     
     return prediction
 
 
+def predict_content_performance_batch(contents, platform="twitter", batch_size=32):
+    """
+    Predict performance for many contents at once.
+    Sentiment is scored in batched passes and the content features are
+    extracted column-wise before the per-content predictions are built.
+    Returns a list of predictions in input order.
+    """
+    from content_features import extract_features
+
+    sentiments = analyze_sentiment_batch(contents, batch_size=batch_size)
+    features = extract_features(contents)
+    # Deterministic estimate from the model trained on historical posts
+    engagement = expected_engagement(contents, platform)
+    if engagement is None:
+        engagement = [None] * len(contents)
+    return [
+        build_prediction(result["sentiment"], int(row.word_count), int(row.hashtag_count),
+                         bool(row.has_emoji), bool(row.has_cta),
+                         expected=None if value is None else float(value))
+        for result, row, value in zip(sentiments, features.itertuples(index=False), engagement)
+    ]
+
+
+def expected_engagement(contents, platform="twitter"):
+    """Trained engagement model's expected interactions per content, or None if unavailable."""
+    try:
+        from engagement_model import predict_engagement
+        return predict_engagement(contents, platform)
+    except Exception as e:
+        print(f"⚠️ Engagement model unavailable: {e}")
+        return None
+
+
+def predict_content_performance_bulk(contents, platform="twitter", sentiments=None, seed=None, batch_size=32):
+    """
+    Score a large column of contents (e.g. 100k historical posts) fully vectorized.
+    platform: one name, or one per content.
+    sentiments: labels per content; scored in batches when omitted.
+    seed: seeds the heuristic's random bases.
+    Returns a DataFrame with the features, factor scores and predicted metrics.
+    """
+    from content_features import extract_features, score_features
+
+    if sentiments is None:
+        sentiments = [r["sentiment"] for r in analyze_sentiment_batch(list(contents), batch_size=batch_size)]
+    engagement = expected_engagement(list(contents), platform)
+    predictions = score_features(extract_features(contents), sentiments, seed=seed)
+    if engagement is not None:
+        predictions["expected_engagement"] = engagement
+    return predictions
+
+
 # ============================================================
 # 🔹 Optimization Recommendations
 # ============================================================
@@ -0,0 +1,172 @@
+# ============================================================
+# 🚦 rate_limiter.py — Shared Groq Rate Limiter & Retry Scheduler
+# Handles:
+#   - Token buckets for requests/minute and tokens/minute
+#   - Jittered exponential backoff on 429 / 5xx (honors Retry-After)
+#   - Queue-depth and throttling metrics
+# Limits come from $GROQ_RPM and $GROQ_TPM.
+# ============================================================
+
+import os
+import time
+import random
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# ============================================================
+# 🔹 Token Bucket
+# ============================================================
+
+class TokenBucket:
+    """Classic token bucket: `capacity` tokens, refilled at `rate` tokens per second."""
+
+    def __init__(self, capacity, rate):
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        self._refill()
+        # A single request larger than the bucket only has to wait for a full bucket
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount):
+        self.tokens -= min(amount, self.capacity)
+
+
+# ============================================================
+# 🔹 Rate Limiter
+# ============================================================
+
+class RateLimiter:
+    """
+    Blocks callers until both the request bucket and the token bucket
+    have room. A 429 from the server pauses every caller, not just the
+    one that received it.
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60)
+        self._cond = threading.Condition()
+        self._paused_until = 0.0
+        self.stats = {"queue_depth": 0, "max_queue_depth": 0, "throttled_seconds": 0.0, "retries": 0}
+
+    def acquire(self, tokens=1):
+        """Wait for capacity for one request that uses roughly `tokens` tokens."""
+        with self._cond:
+            self.stats["queue_depth"] += 1
+            self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], self.stats["queue_depth"])
+            started = time.monotonic()
+            try:
+                while True:
+                    wait = max(
+                        self._paused_until - time.monotonic(),
+                        self.requests.wait_time(1),
+                        self.tokens.wait_time(tokens)
+                    )
+                    if wait <= 0:
+                        self.requests.take(1)
+                        self.tokens.take(tokens)
+                        return
+                    self._cond.wait(wait)
+            finally:
+                self.stats["queue_depth"] -= 1
+                self.stats["throttled_seconds"] += time.monotonic() - started
+
+    def pause(self, seconds):
+        """Hold back all callers for `seconds` (used after a 429)."""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+    def record_retry(self):
+        with self._cond:
+            self.stats["retries"] += 1
+
+    def metrics(self):
+        with self._cond:
+            return dict(self.stats, throttled_seconds=round(self.stats["throttled_seconds"], 2))
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_groq_limiter():
+    """Return the process-wide limiter shared by all Groq callers."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(
+                requests_per_minute=int(os.getenv("GROQ_RPM", "30")),
+                tokens_per_minute=int(os.getenv("GROQ_TPM", "6000"))
+            )
+    return _limiter
+
+
+# ============================================================
+# 🔹 Retry Scheduler
+# ============================================================
+
+def estimate_tokens(request):
+    """Rough token cost of a chat request: ~4 characters per prompt token plus max_tokens."""
+    prompt_chars = sum(len(m.get("content", "")) for m in request.get("messages", []))
+    return prompt_chars // 4 + request.get("max_tokens", 0)
+
+
+def _retry_after(error):
+    """Retry-After header of an API error, in seconds, if present."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_retryable(error):
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    # Connection errors and timeouts carry no status code
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+def call_with_retry(call, tokens=1, limiter=None, max_retries=5, base_delay=1.0, max_delay=30.0):
+    """
+    Run `call()` under the rate limiter, retrying transient failures with
+    jittered exponential backoff. Retry-After from the server takes
+    precedence over the computed delay.
+    """
+    limiter = limiter or get_groq_limiter()
+    for attempt in range(max_retries + 1):
+        limiter.acquire(tokens)
+        try:
+            return call()
+        except Exception as e:
+            if attempt == max_retries or not _is_retryable(e):
+                raise
+            delay = _retry_after(e)
+            if delay is None:
+                delay = min(max_delay, base_delay * 2 ** attempt) * random.uniform(0.5, 1.5)
+            if getattr(e, "status_code", None) == 429:
+                limiter.pause(delay)
+            limiter.record_retry()
+            print(f"⏳ Groq call failed ({type(e).__name__}), retrying in {delay:.1f}s "
+                  f"(attempt {attempt + 1}/{max_retries})")
+            time.sleep(delay)
@@ -2,23 +2,96 @@
 # 🧠 sentiment_analysis.py — Transformer-based Sentiment Analysis (Milestone 3+)
 # ============================================================
 
-from transformers import pipeline
+import os
 from functools import lru_cache
+from sentiment_cache import cache_key, get_sentiment_cache
+
+MODEL_NAME = "cardiffnlp/twitter-roberta-base-sentiment"
+
+# Inference backends: full-precision, dynamic int8 (torch), exported ONNX Runtime graph
+BACKENDS = ("fp32", "int8", "onnx")
+DEFAULT_BACKEND = os.getenv("SENTIMENT_BACKEND", "fp32")
+ONNX_DIR = os.getenv("SENTIMENT_ONNX_DIR", os.path.join(".onnx", MODEL_NAME.split("/")[-1]))
+
+# Model label → readable output
+LABEL_NAMES = {
+    "LABEL_0": "Negative",
+    "LABEL_1": "Neutral",
+    "LABEL_2": "Positive"
+}
 
 # ------------------------------------------------------------
 # Load the pre-trained model only once for speed
 # ------------------------------------------------------------
-@lru_cache(maxsize=1)
-def load_sentiment_model():
+def load_sentiment_model(backend=None):
     """
     Loads a RoBERTa-based model trained on social-media sentiment.
     Model labels:
       LABEL_0 → Negative
       LABEL_1 → Neutral
       LABEL_2 → Positive
+    The backend defaults to $SENTIMENT_BACKEND ("fp32", "int8" or "onnx").
+    """
+    return _load_backend(resolve_backend(backend))
+
+
+@lru_cache(maxsize=None)
+def resolve_backend(backend=None):
+    """
+    The backend that will actually run for a requested one: unknown names,
+    and "onnx" without optimum installed, fall back to fp32 (logged once).
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        print(f"⚠️ Unknown sentiment backend '{backend}', using fp32.")
+        return "fp32"
+    if backend == "onnx":
+        from importlib.util import find_spec
+        if find_spec("optimum") is None or find_spec("onnxruntime") is None:
+            print("⚠️ ONNX backend needs `pip install optimum[onnxruntime]`, using fp32.")
+            return "fp32"
+    return backend
+
+
+@lru_cache(maxsize=None)
+def _load_backend(backend):
+
+    # transformers is imported here, not at module level, so importing this file stays cheap
+    from transformers import pipeline
+
+    print(f"🔍 Loading Transformer model for sentiment analysis ({backend}, first time only)…")
+    if backend == "fp32":
+        return pipeline("sentiment-analysis", model=MODEL_NAME)
+
+    from transformers import AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+
+    if backend == "int8":
+        # Dynamic quantization: Linear weights stored as int8, activations quantized on the fly
+        import torch
+        from transformers import AutoModelForSequenceClassification
+        model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
+
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+
+    # Export once, then reuse the saved graph on later starts
+    if os.path.isdir(ONNX_DIR):
+        model = ORTModelForSequenceClassification.from_pretrained(ONNX_DIR)
+    else:
+        model = ORTModelForSequenceClassification.from_pretrained(MODEL_NAME, export=True)
+        model.save_pretrained(ONNX_DIR)
+    return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
+
+
+def model_id(backend=None):
+    """
+    Cache namespace for a backend; quantized outputs are kept apart from fp32 ones.
+    Named after the backend that actually runs, so a fallback shares fp32's entries.
     """
-    print("🔍 Loading Transformer model for sentiment analysis (first time only)…")
-    return pipeline("sentiment-analysis", model="cardiffnlp/twitter-roberta-base-sentiment")
+    backend = resolve_backend(backend)
+    return MODEL_NAME if backend == "fp32" else f"{MODEL_NAME}:{backend}"
 
 
 # ------------------------------------------------------------
@@ -29,21 +102,24 @@ def analyze_sentiment(text):
     Analyzes sentiment using Hugging Face Transformers.
     Returns: 'Positive', 'Neutral', or 'Negative'
     """
+    cache = get_sentiment_cache()
+    key = cache_key(text, model_id())
+    cached = cache.get(key)
+    if cached is not None:
+        print(f"⚡ Cached sentiment: {cached['sentiment']}  (confidence = {cached['score']:.2f})")
+        return cached["sentiment"]
+
     model = load_sentiment_model()
     try:
+        import torch
+
         # Limit text length to 512 tokens for safety
-        result = model(text[:512])[0]
-        label = result["label"]
+        with torch.inference_mode():
+            result = model(text[:512])[0]
+        sentiment = LABEL_NAMES.get(result["label"], "Positive")
         score = result["score"]
 
-        # Convert model label to readable output
-        if label == "LABEL_0":
-            sentiment = "Negative"
-        elif label == "LABEL_1":
-            sentiment = "Neutral"
-        else:
-            sentiment = "Positive"
-
+        cache.put(key, {"sentiment": sentiment, "score": score})
         print(f"✅ Transformer sentiment: {sentiment}  (confidence = {score:.2f})")
         return sentiment
 
@@ -52,6 +128,127 @@ def analyze_sentiment(text):
         return "Neutral"  # default fallback
 
 
+# ------------------------------------------------------------
+# Analyze Sentiment in Batches
+# ------------------------------------------------------------
+def analyze_sentiment_batch(texts, batch_size=32):
+    """
+    Analyzes many texts with a few padded forward passes instead of one per text.
+    Texts are sorted by character length, a cheap stand-in for token length,
+    so each batch pads to a similar size without tokenizing twice.
+    Cached texts and duplicates within the call skip the model entirely.
+    Returns a list of {"sentiment": ..., "score": ...} dicts in input order.
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+    texts = [str(t) for t in texts]
+    results = [None] * len(texts)
+    if not texts:
+        return results
+
+    cache = get_sentiment_cache()
+    keys = [cache_key(t, model_id()) for t in texts]
+    cached = cache.get_many(set(keys))
+
+    # One model input per distinct uncached key
+    pending = {}
+    for i, key in enumerate(keys):
+        if key in cached:
+            results[i] = dict(cached[key])
+        else:
+            pending.setdefault(key, []).append(i)
+
+    if not pending:
+        print(f"⚡ All {len(texts)} sentiments served from cache")
+        return results
+
+    # Sort by length so padding within each batch stays small
+    order = sorted(pending, key=lambda k: len(texts[pending[k][0]]))
+    scored = score_texts([texts[pending[k][0]] for k in order], batch_size=batch_size)
+
+    fresh = {}
+    for key, value in zip(order, scored):
+        if value is None:
+            for i in pending[key]:
+                results[i] = {"sentiment": "Neutral", "score": 0.0}  # default fallback
+        else:
+            fresh[key] = value
+
+    # Only successful results are cached; failures fall back without being remembered
+    cache.put_many(fresh)
+    for key, value in fresh.items():
+        for i in pending[key]:
+            results[i] = dict(value)
+
+    print(f"✅ Transformer sentiment scored {len(order)} new texts in "
+          f"{-(-len(order) // batch_size)} batch(es), {len(texts) - sum(map(len, pending.values()))} from cache")
+    return results
+
+
+# ------------------------------------------------------------
+# Uncached Batched Inference
+# ------------------------------------------------------------
+def score_texts(texts, backend=None, batch_size=32):
+    """
+    Runs padded forward passes over texts in the given order, without the cache.
+    Returns {"sentiment": ..., "score": ...} per text, or None where a batch failed.
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+    import torch
+
+    model = load_sentiment_model(backend)
+    tokenizer = model.tokenizer
+    id2label = model.model.config.id2label
+    results = [None] * len(texts)
+
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start:start + batch_size]
+        try:
+            encoded = tokenizer(
+                batch,
+                padding=True,
+                truncation=True,
+                max_length=512,
+                return_tensors="pt"
+            )
+            # Per call, not process-wide: grad mode is thread-local in torch
+            with torch.inference_mode():
+                logits = model.model(**encoded).logits
+            scores, label_ids = torch.softmax(logits, dim=-1).max(dim=-1)
+
+            for offset, (label_id, score) in enumerate(zip(label_ids.tolist(), scores.tolist())):
+                label = id2label.get(label_id, f"LABEL_{label_id}")
+                results[start + offset] = {"sentiment": LABEL_NAMES.get(label, "Positive"), "score": score}
+
+        except Exception as e:
+            print(f"❌ Batch sentiment analysis failed: {e}")
+
+    return results
+
+
+# ------------------------------------------------------------
+# Warm-up (server start)
+# ------------------------------------------------------------
+def warm_up_sentiment(backend=None):
+    """
+    Loads the model and runs one forward pass so tokenizer and kernel setup
+    happen now rather than on the first request. Called in the gunicorn master
+    with preload_app, forked workers then share the weights copy-on-write.
+    Bypasses the sentiment cache so no SQLite handle is opened before the fork.
+    """
+    try:
+        model = load_sentiment_model(backend)
+        if hasattr(model.model, "eval"):
+            model.model.eval()
+        score_texts(["warm-up"], backend=backend)
+        print("🔥 Sentiment model warmed up.")
+        return True
+    except Exception as e:
+        print(f"⚠️ Sentiment warm-up skipped: {e}")
+        return False
+
+
 # ------------------------------------------------------------
 # Quick local test
 # ------------------------------------------------------------
@@ -65,3 +262,9 @@ if __name__ == "__main__":
         print(f"\nText: {text}")
         sentiment = analyze_sentiment(text)
         print(f"Sentiment → {sentiment}")
+
+    print("\nBatch:")
+    for text, result in zip(samples, analyze_sentiment_batch(samples)):
+        print(f"{result['sentiment']:>8} ({result['score']:.2f}) ← {text}")
+
+    print(f"\nCache: {get_sentiment_cache().report()}")
@@ -0,0 +1,137 @@
+# ============================================================
+# 🗃️ sentiment_cache.py — Two-tier Sentiment Result Cache
+# Handles:
+#   - In-memory LRU tier for the current process
+#   - Persistent SQLite tier shared across runs
+#   - Hit/miss counters for both tiers
+# ============================================================
+
+import os
+import re
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CACHE_PATH = os.getenv("SENTIMENT_CACHE_PATH", ".sentiment_cache.sqlite")
+MEMORY_SIZE = int(os.getenv("SENTIMENT_CACHE_MEMORY_SIZE", "4096"))
+
+# ============================================================
+# 🔹 Cache Keys
+# ============================================================
+
+def normalize_text(text):
+    """
+    Normalize text so trivially different copies share a cache entry:
+    Unicode NFC, collapsed whitespace, trimmed ends.
+    """
+    text = unicodedata.normalize("NFC", str(text))
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def cache_key(text, model_name):
+    """Content-addressed key: SHA-256 of the model name plus the normalized text."""
+    payload = f"{model_name}\0{normalize_text(text)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+# ============================================================
+# 🔹 Two-tier Cache
+# ============================================================
+
+class SentimentCache:
+    """
+    LRU dictionary in front of a SQLite table.
+    Values are {"sentiment": ..., "score": ...} dicts.
+    """
+
+    def __init__(self, path=CACHE_PATH, memory_size=MEMORY_SIZE):
+        self.path = path
+        self.memory_size = memory_size
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    def _db(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sentiment ("
+                "key TEXT PRIMARY KEY, sentiment TEXT NOT NULL, score REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys):
+        """Look up many keys at once. Returns {key: value} for the hits only."""
+        found = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+                    self.stats["memory_hits"] += 1
+                else:
+                    missing.append(key)
+
+            # SQLite caps bound parameters, so query the disk tier in chunks
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                rows = self._db().execute(
+                    f"SELECT key, sentiment, score FROM sentiment WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for key, sentiment, score in rows:
+                    value = {"sentiment": sentiment, "score": score}
+                    found[key] = value
+                    self._remember(key, value)
+                    self.stats["disk_hits"] += 1
+
+            self.stats["misses"] += len(missing) - sum(1 for k in missing if k in found)
+        return found
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items):
+        """Store {key: value} pairs in both tiers."""
+        with self._lock:
+            for key, value in items.items():
+                self._remember(key, value)
+            self._db().executemany(
+                "INSERT OR REPLACE INTO sentiment (key, sentiment, score) VALUES (?, ?, ?)",
+                [(k, v["sentiment"], v["score"]) for k, v in items.items()]
+            )
+            self._db().commit()
+
+    def put(self, key, value):
+        self.put_many({key: value})
+
+    def report(self):
+        """Return hit/miss counters plus the overall hit rate."""
+        total = sum(self.stats.values())
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        return {**self.stats, "hit_rate": round(hits / total, 3) if total else 0.0}
+
+
+_cache = None
+
+
+def get_sentiment_cache():
+    """Return the process-wide sentiment cache."""
+    global _cache
+    if _cache is None:
+        _cache = SentimentCache()
+    return _cache
@@ -0,0 +1,365 @@
+# ============================================================
+# 📊 sheets_backend.py — Pluggable Google Sheets Backend
+# Handles:
+#   - Choosing the backend from $SHEETS_BACKEND ("google" or "emulator")
+#   - The live Sheets API client (service-account credentials)
+#   - An in-process emulator with the same call surface as the
+#     googleapiclient service, backed by SQLite, with simulated latency
+# Emulator settings:
+#   SHEETS_EMULATOR_PATH        SQLite file (default ".sheets_emulator.sqlite")
+#   SHEETS_EMULATOR_LATENCY_MS  delay added to every execute() (default 0)
+# Without GOOGLE_SHEET_ID the emulator stores everything under the
+# spreadsheet id "local".
+# ============================================================
+
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
+
+# Emulator spreadsheet id used when the caller passes none (GOOGLE_SHEET_ID unset)
+LOCAL_SPREADSHEET = "local"
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_sheets_service(cred_path=None):
+    """
+    Return a Sheets service object for the configured backend.
+    Both backends support: spreadsheets().get / batchUpdate and
+    spreadsheets().values().append / update / clear / get.
+    """
+    backend = os.getenv("SHEETS_BACKEND", "google")
+    cred_path = cred_path or os.getenv("GOOGLE_SHEETS_CREDENTIALS", "credentials.json")
+    key = (backend, cred_path)
+
+    with _services_lock:
+        if key not in _services:
+            if backend == "emulator":
+                print("🧪 Using local Google Sheets emulator.")
+                _services[key] = SheetsEmulator(
+                    os.getenv("SHEETS_EMULATOR_PATH", ".sheets_emulator.sqlite"),
+                    latency=float(os.getenv("SHEETS_EMULATOR_LATENCY_MS", "0")) / 1000
+                )
+            else:
+                from googleapiclient.discovery import build
+                from google.oauth2 import service_account
+
+                creds = service_account.Credentials.from_service_account_file(cred_path, scopes=SCOPES)
+                _services[key] = build("sheets", "v4", credentials=creds)
+        return _services[key]
+
+
+# ============================================================
+# 🔹 Emulator Errors (shaped like googleapiclient HttpError)
+# ============================================================
+
+class _Resp:
+    def __init__(self, status):
+        self.status = status
+
+
+class EmulatorHttpError(Exception):
+    """Mirrors HttpError: exposes .resp.status and the API's error message."""
+
+    def __init__(self, status, message):
+        super().__init__(f"<HttpError {status}: \"{message}\">")
+        self.resp = _Resp(status)
+
+
+# ============================================================
+# 🔹 A1 Range Parsing
+# ============================================================
+
+_CELL = re.compile(r"^([A-Za-z]*)(\d*)$")
+
+
+def _column_index(letters):
+    index = 0
+    for ch in letters.upper():
+        index = index * 26 + (ord(ch) - 64)
+    return index - 1
+
+
+def parse_range(a1):
+    """
+    'Tab!A1:C10' → ('Tab', row0, col0, row1, col1) with zero-based, inclusive bounds.
+    Open ends (e.g. 'Tab', 'Tab!A:C') are None.
+    """
+    tab, _, cells = a1.partition("!")
+    tab = tab.strip("'")
+    if not cells:
+        return tab, 0, 0, None, None
+
+    start, _, end = cells.partition(":")
+    bounds = []
+    for part in (start, end or start):
+        match = _CELL.match(part)
+        if not match:
+            raise EmulatorHttpError(400, f"Unable to parse range: {a1}")
+        letters, digits = match.groups()
+        bounds.append((
+            int(digits) - 1 if digits else None,
+            _column_index(letters) if letters else None
+        ))
+    (row0, col0), (row1, col1) = bounds
+    if not end:
+        return tab, row0 or 0, col0 or 0, row0, col0
+    return tab, row0 or 0, col0 or 0, row1, col1
+
+
+# ============================================================
+# 🔹 Emulator
+# ============================================================
+
+class _Request:
+    """Deferred call, executed (with simulated latency) on .execute()."""
+
+    def __init__(self, emulator, fn, *args):
+        self._emulator = emulator
+        self._fn = fn
+        self._args = args
+
+    def execute(self):
+        if self._emulator.latency:
+            time.sleep(self._emulator.latency)
+        with self._emulator.lock:
+            try:
+                result = self._fn(*self._args)
+            except Exception:
+                # Like the real API, a failed batch leaves the spreadsheet untouched
+                self._emulator.db.rollback()
+                raise
+            self._emulator.db.commit()
+            return result
+
+
+class SheetsEmulator:
+    """In-process stand-in for the Sheets v4 service. Values are stored per cell."""
+
+    def __init__(self, path=":memory:", latency=0.0):
+        self.latency = latency
+        self.lock = threading.RLock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.executescript(
+            "CREATE TABLE IF NOT EXISTS tabs ("
+            "  spreadsheet TEXT, title TEXT, sheet_id INTEGER, PRIMARY KEY (spreadsheet, title));"
+            "CREATE TABLE IF NOT EXISTS cells ("
+            "  spreadsheet TEXT, tab TEXT, row INTEGER, col INTEGER, value TEXT,"
+            "  PRIMARY KEY (spreadsheet, tab, row, col));"
+        )
+        self.db.commit()
+        self.stats = {"calls": 0}
+
+    # --- googleapiclient-style entry points ---
+    def spreadsheets(self):
+        return _Spreadsheets(self)
+
+    # --- storage helpers ---
+    def _count(self):
+        self.stats["calls"] += 1
+
+    def _tabs(self, spreadsheet):
+        rows = self.db.execute(
+            "SELECT title, sheet_id FROM tabs WHERE spreadsheet = ? ORDER BY rowid", (spreadsheet,)
+        ).fetchall()
+        tabs = dict(rows)
+        # Every new spreadsheet starts with Sheet1, like the real thing
+        if not tabs:
+            self.db.execute("INSERT INTO tabs VALUES (?, 'Sheet1', 0)", (spreadsheet,))
+            tabs = {"Sheet1": 0}
+        return tabs
+
+    def _tab_for(self, spreadsheet, a1):
+        tab = parse_range(a1)[0]
+        if tab not in self._tabs(spreadsheet):
+            raise EmulatorHttpError(400, f"Unable to parse range: {a1}")
+        return tab
+
+    def _tab_by_id(self, spreadsheet, sheet_id):
+        for title, sid in self._tabs(spreadsheet).items():
+            if sid == sheet_id:
+                return title
+        raise EmulatorHttpError(400, f"Invalid requests: No grid with id: {sheet_id}")
+
+    def _last_row(self, spreadsheet, tab):
+        row = self.db.execute(
+            "SELECT MAX(row) FROM cells WHERE spreadsheet = ? AND tab = ?", (spreadsheet, tab)
+        ).fetchone()[0]
+        return -1 if row is None else row
+
+    def _write(self, spreadsheet, tab, row0, col0, values):
+        cells = [
+            (spreadsheet, tab, row0 + r, col0 + c, value)
+            for r, row in enumerate(values)
+            for c, value in enumerate(row)
+        ]
+        # Empty strings/None blank the cell instead of storing a value
+        self.db.executemany(
+            "DELETE FROM cells WHERE spreadsheet = ? AND tab = ? AND row = ? AND col = ?",
+            [cell[:4] for cell in cells if cell[4] is None or cell[4] == ""]
+        )
+        self.db.executemany(
+            "INSERT OR REPLACE INTO cells VALUES (?, ?, ?, ?, ?)",
+            [cell[:4] + (json.dumps(cell[4]),) for cell in cells if cell[4] is not None and cell[4] != ""]
+        )
+
+    # --- API operations ---
+    def get_metadata(self, spreadsheet, fields=None):
+        self._count()
+        return {"sheets": [
+            {"properties": {"title": title, "sheetId": sid}}
+            for title, sid in self._tabs(spreadsheet).items()
+        ]}
+
+    def batch_update(self, spreadsheet, body):
+        self._count()
+        replies = []
+        for request in body.get("requests", []):
+            if "addSheet" in request:
+                props = request["addSheet"]["properties"]
+                tabs = self._tabs(spreadsheet)
+                if props["title"] in tabs:
+                    raise EmulatorHttpError(
+                        400, f"Invalid requests[0].addSheet: A sheet with the name \"{props['title']}\" already exists."
+                    )
+                sheet_id = props.get("sheetId", max(tabs.values(), default=0) + 1)
+                self.db.execute("INSERT INTO tabs VALUES (?, ?, ?)", (spreadsheet, props["title"], sheet_id))
+                replies.append({"addSheet": {"properties": {"title": props["title"], "sheetId": sheet_id}}})
+            elif "updateCells" in request:
+                update = request["updateCells"]
+                start = update["start"]
+                tab = self._tab_by_id(spreadsheet, start["sheetId"])
+                self._write(spreadsheet, tab, start.get("rowIndex", 0), start.get("columnIndex", 0),
+                            _cell_rows(update["rows"]))
+                replies.append({})
+            elif "appendCells" in request:
+                append = request["appendCells"]
+                tab = self._tab_by_id(spreadsheet, append["sheetId"])
+                self._write(spreadsheet, tab, self._last_row(spreadsheet, tab) + 1, 0, _cell_rows(append["rows"]))
+                replies.append({})
+            else:
+                raise EmulatorHttpError(400, f"Emulator does not support request: {list(request)}")
+        return {"spreadsheetId": spreadsheet, "replies": replies}
+
+    def values_append(self, spreadsheet, a1, body):
+        self._count()
+        tab = self._tab_for(spreadsheet, a1)
+        _, _, col0, _, _ = parse_range(a1)
+        values = body.get("values", [])
+        start = self._last_row(spreadsheet, tab) + 1
+        self._write(spreadsheet, tab, start, col0, values)
+        return {"updates": {"updatedRange": a1, "updatedRows": len(values)}}
+
+    def values_update(self, spreadsheet, a1, body):
+        self._count()
+        tab = self._tab_for(spreadsheet, a1)
+        _, row0, col0, _, _ = parse_range(a1)
+        values = body.get("values", [])
+        self._write(spreadsheet, tab, row0, col0, values)
+        return {"updatedRange": a1, "updatedRows": len(values)}
+
+    def values_clear(self, spreadsheet, a1):
+        self._count()
+        tab = self._tab_for(spreadsheet, a1)
+        _, row0, col0, row1, col1 = parse_range(a1)
+        self.db.execute(
+            "DELETE FROM cells WHERE spreadsheet = ? AND tab = ? AND row >= ? AND col >= ?"
+            " AND (? IS NULL OR row <= ?) AND (? IS NULL OR col <= ?)",
+            (spreadsheet, tab, row0, col0, row1, row1, col1, col1)
+        )
+        return {"clearedRange": a1}
+
+    def values_get(self, spreadsheet, a1):
+        self._count()
+        tab = self._tab_for(spreadsheet, a1)
+        _, row0, col0, row1, col1 = parse_range(a1)
+        cells = self.db.execute(
+            "SELECT row, col, value FROM cells WHERE spreadsheet = ? AND tab = ? AND row >= ? AND col >= ?"
+            " AND (? IS NULL OR row <= ?) AND (? IS NULL OR col <= ?) ORDER BY row, col",
+            (spreadsheet, tab, row0, col0, row1, row1, col1, col1)
+        ).fetchall()
+        if not cells:
+            return {"range": a1, "majorDimension": "ROWS"}
+        rows = [[] for _ in range(cells[-1][0] - row0 + 1)]
+        for row, col, value in cells:
+            line = rows[row - row0]
+            line.extend([""] * (col - col0 + 1 - len(line)))
+            line[col - col0] = json.loads(value)
+        return {"range": a1, "majorDimension": "ROWS", "values": rows}
+
+
+def _cell_rows(rows):
+    """CellData rows (as used by updateCells/appendCells) → plain value rows."""
+    values = []
+    for row in rows:
+        line = []
+        for cell in row.get("values", []):
+            entered = cell.get("userEnteredValue", {})
+            line.append(next(iter(entered.values()), None))
+        values.append(line)
+    return values
+
+
+def _spreadsheet_id(spreadsheetId):
+    # NULL never matches `spreadsheet = ?`, so an unset id gets a real key
+    return spreadsheetId or LOCAL_SPREADSHEET
+
+
+class _Spreadsheets:
+    def __init__(self, emulator):
+        self._e = emulator
+
+    def get(self, spreadsheetId, fields=None, **kwargs):
+        return _Request(self._e, self._e.get_metadata, _spreadsheet_id(spreadsheetId), fields)
+
+    def batchUpdate(self, spreadsheetId, body):
+        return _Request(self._e, self._e.batch_update, _spreadsheet_id(spreadsheetId), body)
+
+    def values(self):
+        return _Values(self._e)
+
+
+class _Values:
+    def __init__(self, emulator):
+        self._e = emulator
+
+    def append(self, spreadsheetId, range, body, valueInputOption=None, insertDataOption=None, **kwargs):
+        return _Request(self._e, self._e.values_append, _spreadsheet_id(spreadsheetId), range, body)
+
+    def update(self, spreadsheetId, range, body, valueInputOption=None, **kwargs):
+        return _Request(self._e, self._e.values_update, _spreadsheet_id(spreadsheetId), range, body)
+
+    def clear(self, spreadsheetId, range, body=None, **kwargs):
+        return _Request(self._e, self._e.values_clear, _spreadsheet_id(spreadsheetId), range)
+
+    def get(self, spreadsheetId, range, **kwargs):
+        return _Request(self._e, self._e.values_get, _spreadsheet_id(spreadsheetId), range)
+
+
+# ============================================================
+# 🧪 Quick Emulator Check
+# ============================================================
+
+if __name__ == "__main__":
+    service = SheetsEmulator(latency=0.05)
+    sheets = service.spreadsheets()
+    sheets.batchUpdate(spreadsheetId="demo", body={"requests": [
+        {"addSheet": {"properties": {"title": "AB_Testing"}}}
+    ]}).execute()
+    sheets.values().update(spreadsheetId="demo", range="AB_Testing!A1",
+                           valueInputOption="RAW", body={"values": [["Topic", "Views"]]}).execute()
+    start = time.perf_counter()
+    for i in range(5):
+        sheets.values().append(spreadsheetId="demo", range="AB_Testing!A1", valueInputOption="RAW",
+                               insertDataOption="INSERT_ROWS", body={"values": [[f"topic {i}", i * 100]]}).execute()
+    print(f"🧪 5 appends took {(time.perf_counter() - start) * 1000:.0f} ms (50 ms simulated latency each)")
+    print(sheets.values().get(spreadsheetId="demo", range="AB_Testing!A1:B10").execute())
@@ -0,0 +1,242 @@
+# ============================================================
+# 📊 sheets_writer.py — Batched Write-behind Queue for Google Sheets
+# Handles:
+#   - Buffering appended rows per tab
+#   - Flushing on a row-count or age threshold (background thread)
+#   - One batchUpdate per flush for all tabs (missing tabs created inline),
+#     retried on quota errors; a rejected batch is retried tab by tab so
+#     one bad tab can't block the others
+#   - Failed rows go back into the buffer, or to a local JSONL file when
+#     the buffer is full or the process is exiting (retry_failed_rows())
+#   - Draining the buffer at interpreter shutdown
+# ============================================================
+
+import os
+import json
+import time
+import atexit
+import random
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MAX_ROWS = int(os.getenv("SHEETS_FLUSH_ROWS", "50"))
+MAX_DELAY = float(os.getenv("SHEETS_FLUSH_SECONDS", "5"))
+# Rows kept in memory for retry after failed flushes; beyond this they spill to FAILED_ROWS_PATH
+MAX_BUFFERED_ROWS = int(os.getenv("SHEETS_MAX_BUFFERED_ROWS", "5000"))
+FAILED_ROWS_PATH = os.getenv("SHEETS_FAILED_ROWS_PATH", ".sheets_failed_rows.jsonl")
+RETRYABLE_STATUS = {429, 500, 503}
+
+
+def _status(error):
+    """HTTP status of a googleapiclient HttpError, if any."""
+    resp = getattr(error, "resp", None)
+    try:
+        return int(getattr(resp, "status", None))
+    except (TypeError, ValueError):
+        return None
+
+
+class BufferedSheetWriter:
+    """
+    Collects rows per tab and writes them in as few API calls as possible.
+    Call flush() to write immediately; close() flushes and stops the timer.
+    """
+
+    def __init__(self, max_rows=MAX_ROWS, max_delay=MAX_DELAY, max_retries=5):
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.max_retries = max_retries
+        self._buffers = {}      # tab → list of rows
+        self._headers = {}      # tab → header row used if the tab must be created
+        self._oldest = None     # time the oldest buffered row arrived
+        self._retry_at = 0.0    # after a failed flush, size-triggered flushes wait until then
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = None
+        self.stats = {"rows": 0, "api_calls": 0, "retries": 0, "requeued": 0, "spilled": 0}
+
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="sheets-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.max_delay)
+            self._wake.clear()
+            with self._lock:
+                due = self._oldest is not None and time.monotonic() - self._oldest >= self.max_delay
+            if due:
+                self.flush()
+
+    def append(self, tab, row, headers=None):
+        """Queue one row for a tab; flushes when the buffer reaches max_rows."""
+        with self._lock:
+            self._buffers.setdefault(tab, []).append(list(row))
+            if headers and tab not in self._headers:
+                self._headers[tab] = list(headers)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            pending = sum(len(rows) for rows in self._buffers.values())
+        self._start()
+        if pending >= self.max_rows and time.monotonic() >= self._retry_at:
+            self.flush()
+
+    def flush(self):
+        """
+        Write every buffered row now, for all tabs, in one batchUpdate call.
+        Rows that could not be written are kept for the next flush.
+        """
+        with self._flush_lock:
+            with self._lock:
+                buffers, self._buffers = self._buffers, {}
+                self._oldest = None
+            if buffers:
+                failed = self._write(buffers)
+                if failed:
+                    self._requeue(failed)
+
+    def _requeue(self, failed):
+        """Put failed rows back in front of newer ones, or spill them to disk."""
+        count = sum(len(rows) for rows in failed.values())
+        with self._lock:
+            pending = sum(len(rows) for rows in self._buffers.values())
+            spill = self._closed or pending + count > MAX_BUFFERED_ROWS
+            if not spill:
+                for tab, rows in failed.items():
+                    self._buffers[tab] = rows + self._buffers.get(tab, [])
+                self._oldest = time.monotonic()
+                self._retry_at = self._oldest + self.max_delay
+                self.stats["requeued"] += count
+        if spill:
+            self._spill(failed)
+        else:
+            print(f"↩️ Kept {count} unwritten row(s) for the next flush.")
+
+    def _spill(self, failed):
+        try:
+            with open(FAILED_ROWS_PATH, "a", encoding="utf-8") as f:
+                for tab, rows in failed.items():
+                    for row in rows:
+                        f.write(json.dumps({"tab": tab, "row": row, "headers": self._headers.get(tab)},
+                                           ensure_ascii=False, default=str) + "\n")
+        except OSError as e:
+            print(f"❌ Could not save unwritten rows to {FAILED_ROWS_PATH}: {e}")
+            return
+        self.stats["spilled"] += sum(len(rows) for rows in failed.values())
+        print(f"💾 Saved unwritten rows for {list(failed)} to {FAILED_ROWS_PATH}; "
+              f"replay them with retry_failed_rows().")
+
+    def _write(self, buffers):
+        """
+        Send all tabs in one batchUpdate. If the API rejects the batch, send
+        each tab on its own so only the failing tabs' rows are held back.
+        Returns {tab: rows} that could not be written.
+        """
+        error = self._send(buffers)
+        if error is None:
+            return {}
+        if len(buffers) == 1 or _status(error) in RETRYABLE_STATUS:
+            # Still over quota after every retry: splitting would only add calls
+            return buffers
+        print(f"🔀 Batch rejected, retrying {len(buffers)} tab(s) one by one...")
+        return {tab: rows for tab, rows in buffers.items() if self._send({tab: rows}) is not None}
+
+    def _send(self, buffers):
+        """One batchUpdate with quota retries. Returns None on success, else the last error."""
+        from google_sheets_example import (
+            get_service, get_tab_registry, is_missing_tab_error, row_data, SHEET_ID
+        )
+
+        registry = get_tab_registry()
+        total = sum(len(rows) for rows in buffers.values())
+        reloaded = False
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                # Missing tabs are created (with headers) in the same request as the rows
+                creation = registry.creation_requests({tab: self._headers.get(tab) for tab in buffers})
+                new_ids = {
+                    r["addSheet"]["properties"]["title"]: r["addSheet"]["properties"]["sheetId"]
+                    for r in creation if "addSheet" in r
+                }
+                appends = [
+                    {"appendCells": {
+                        "sheetId": new_ids.get(tab, registry.sheet_id(tab)),
+                        "rows": [row_data(row) for row in rows],
+                        "fields": "userEnteredValue"
+                    }}
+                    for tab, rows in buffers.items()
+                ]
+                get_service().spreadsheets().batchUpdate(
+                    spreadsheetId=SHEET_ID, body={"requests": creation + appends}
+                ).execute()
+                registry.mark_created(creation)
+                self.stats["api_calls"] += 1
+                self.stats["rows"] += total
+                print(f"📊 Flushed {total} row(s) to {list(buffers)} in one call.")
+                return None
+            except Exception as e:
+                if is_missing_tab_error(e) and not reloaded:
+                    # A tab was deleted or renamed behind our back: reload metadata once
+                    registry.invalidate()
+                    reloaded = True
+                    continue
+                if _status(e) not in RETRYABLE_STATUS or attempt == self.max_retries:
+                    print(f"❌ Error flushing {total} row(s) to {list(buffers)}: {e}")
+                    return e
+                delay = min(60, 2 ** attempt) * random.uniform(0.5, 1.5)
+                self.stats["retries"] += 1
+                print(f"⏳ Sheets quota hit, retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def close(self):
+        """Stop the background thread and drain the buffer."""
+        self._closed = True
+        self._wake.set()
+        self.flush()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_sheet_writer():
+    """Return the process-wide writer; it is drained automatically at exit."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = BufferedSheetWriter()
+            atexit.register(_writer.close)
+    return _writer
+
+
+def flush_sheets():
+    """Write all pending rows now (no-op if nothing was queued)."""
+    if _writer is not None:
+        _writer.flush()
+
+
+def retry_failed_rows(path=FAILED_ROWS_PATH):
+    """Queue the rows saved by earlier failed flushes again and write them now."""
+    if not os.path.exists(path):
+        return 0
+    # Move the file aside first so rows that fail again are saved afresh
+    pending = path + ".retrying"
+    os.replace(path, pending)
+    writer = get_sheet_writer()
+    count = 0
+    with open(pending, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                writer.append(entry["tab"], entry["row"], entry.get("headers"))
+                count += 1
+    os.remove(pending)
+    writer.flush()
+    print(f"🔁 Re-queued {count} saved row(s).")
+    return count
@@ -3,7 +3,10 @@
 # ============================================================
 
 import os
-import requests
+import time
+import queue
+import atexit
+import threading
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -11,25 +14,287 @@ load_dotenv()
 
 SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL")
 
+# Deliver in the background unless SLACK_ASYNC=0
+SLACK_ASYNC = os.getenv("SLACK_ASYNC", "1") != "0"
+SLACK_QUEUE_SIZE = int(os.getenv("SLACK_QUEUE_SIZE", "100"))
+SLACK_MAX_RETRIES = 3
+# Longest Retry-After we honor; Slack sends small values, a huge one would stall the worker
+SLACK_MAX_RETRY_AFTER = float(os.getenv("SLACK_MAX_RETRY_AFTER", "30"))
+
+# ============================================================
+# 🔹 Delivery: keep-alive session + background worker
+# ============================================================
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _get_session():
+    """One pooled keep-alive session, so repeat posts skip the TCP+TLS handshake."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            # requests costs ~100 ms to import; only pay it when something is sent
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            _session = requests.Session()
+            _session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        return _session
+
+
+def _post(payload: dict, success: str, failure: str):
+    """POST to the webhook, retrying 429/5xx (honoring Retry-After) and connection errors."""
+    for attempt in range(SLACK_MAX_RETRIES + 1):
+        try:
+            response = _get_session().post(SLACK_WEBHOOK_URL, json=payload, timeout=10)
+        except Exception as e:
+            if attempt == SLACK_MAX_RETRIES:
+                print(f"{failure}: {e}")
+                return False
+            time.sleep(2 ** attempt)
+            continue
+
+        if response.status_code == 200:
+            print(success)
+            return True
+        if response.status_code == 429 or response.status_code >= 500:
+            if attempt < SLACK_MAX_RETRIES:
+                try:
+                    delay = float(response.headers.get("Retry-After", 2 ** attempt))
+                except ValueError:
+                    delay = 2 ** attempt
+                time.sleep(min(max(delay, 0), SLACK_MAX_RETRY_AFTER))
+                continue
+        print(f"{failure}: {response.text}")
+        return False
+
+
+class SlackDeliveryWorker:
+    """
+    Background thread draining a bounded queue of Slack payloads.
+    When the queue is full the caller delivers synchronously (backpressure).
+    """
+
+    def __init__(self, maxsize=SLACK_QUEUE_SIZE):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._thread = threading.Thread(target=self._run, name="slack-delivery", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                _post(*job)
+            finally:
+                self._queue.task_done()
+
+    def submit(self, payload, success, failure):
+        try:
+            self._queue.put_nowait((payload, success, failure))
+        except queue.Full:
+            _post(payload, success, failure)
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def flush(self, timeout=None):
+        """Wait until every queued message has been delivered (or timeout seconds pass)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def _get_worker():
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = SlackDeliveryWorker()
+        return _worker
+
+
+def _deliver(payload: dict, success: str, failure: str):
+    if SLACK_ASYNC:
+        _get_worker().submit(payload, success, failure)
+    else:
+        _post(payload, success, failure)
+
+
+def flush_slack(timeout=None):
+    """Send any pending digest, then block until queued Slack messages are delivered."""
+    if _digest is not None:
+        _digest.flush()
+    return _worker.flush(timeout) if _worker is not None else True
+
+
+# Give buffered and queued alerts a chance to go out before the process exits
+atexit.register(flush_slack, 30)
+
+
+# ============================================================
+# 🔹 Digest Mode: collapse alert bursts into one Block Kit post
+# ============================================================
+
+# Off unless SLACK_DIGEST=1 or inside `with slack_digest():`
+SLACK_DIGEST = os.getenv("SLACK_DIGEST", "0") == "1"
+DIGEST_WINDOW_SECONDS = float(os.getenv("SLACK_DIGEST_WINDOW_SECONDS", "60"))
+DIGEST_MAX_ALERTS = int(os.getenv("SLACK_DIGEST_MAX_ALERTS", "25"))
+
+# Slack caps: 50 blocks per message, 3000 characters per section text
+MAX_BLOCKS = 50
+MAX_SECTION_CHARS = 3000
+
+
+def _block_payload(title: str, sections: list):
+    """Header + one mrkdwn section per entry + divider (the send_block_message layout)."""
+    blocks = [{"type": "header", "text": {"type": "plain_text", "text": f"📢 {title}"[:150]}}]
+    for content in sections:
+        blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": content}})
+    blocks.append({"type": "divider"})
+    return {"blocks": blocks}
+
+
+def _clip(text: str, limit=MAX_SECTION_CHARS):
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+class SlackDigest:
+    """
+    Buffers alerts and sends them as one digest message once `max_alerts`
+    arrive or `window` seconds pass since the first one. Alerts are grouped
+    by topic inside the message, and the message is split into numbered
+    pages only when it would exceed Slack's block limit. Identical alerts
+    for the same topic are listed once with a repeat count.
+    """
+
+    def __init__(self, window=DIGEST_WINDOW_SECONDS, max_alerts=DIGEST_MAX_ALERTS):
+        self.window = window
+        self.max_alerts = max_alerts
+        self._alerts = {}       # (topic, text) → count, in arrival order
+        self._received = 0
+        self._timer = None
+        self._lock = threading.Lock()
+        self.stats = {"alerts": 0, "duplicates": 0, "messages": 0}
+
+    def add(self, text: str, topic=None):
+        topic = topic or "General"
+        with self._lock:
+            key = (topic, text.strip())
+            if key in self._alerts:
+                self.stats["duplicates"] += 1
+            self._alerts[key] = self._alerts.get(key, 0) + 1
+            self._received += 1
+            self.stats["alerts"] += 1
+            full = self._received >= self.max_alerts
+            if self._timer is None and not full:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def pages(self, alerts, received):
+        """Build the digest payloads, split into pages that respect Slack's block limit."""
+        by_topic, totals = {}, {}
+        for (topic, text), count in alerts.items():
+            by_topic.setdefault(topic, []).append(text + (f"  _(×{count})_" if count > 1 else ""))
+            totals[topic] = totals.get(topic, 0) + count
+
+        sections = []
+        for topic, texts in by_topic.items():
+            sections.append(_clip(f"🔖 *{topic}* — {totals[topic]} alert(s)"))
+            sections.extend(_clip(text) for text in texts)
+
+        per_page = MAX_BLOCKS - 2   # room for the header and divider
+        chunks = [sections[i:i + per_page] for i in range(0, len(sections), per_page)]
+        title = f"Digest: {received} alert(s) across {len(by_topic)} topic(s)"
+        if len(chunks) == 1:
+            return [_block_payload(title, chunks[0])]
+        return [_block_payload(f"{title} ({n}/{len(chunks)})", chunk) for n, chunk in enumerate(chunks, 1)]
+
+    def flush(self):
+        """Send everything buffered so far (no-op when empty)."""
+        with self._lock:
+            alerts, received = self._alerts, self._received
+            self._alerts, self._received = {}, 0
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not alerts:
+            return
+        for payload in self.pages(alerts, received):
+            self.stats["messages"] += 1
+            _deliver(payload, f"✅ Sent Slack digest of {received} alert(s).", "❌ Failed to send Slack digest")
+
+
+_digest = None
+_digest_depth = 0
+_digest_lock = threading.Lock()
+
+
+def _get_digest():
+    global _digest
+    with _digest_lock:
+        if _digest is None:
+            _digest = SlackDigest()
+        return _digest
+
+
+def _digest_active():
+    return SLACK_DIGEST or _digest_depth > 0
+
+
+class slack_digest:
+    """
+    Context manager that routes alerts into a digest for its duration and
+    sends the digest on exit:
+
+        with slack_digest():
+            for topic in topics:
+                run_content_generation(topic)
+    """
+
+    def __enter__(self):
+        global _digest_depth
+        with _digest_lock:
+            _digest_depth += 1
+        return _get_digest()
+
+    def __exit__(self, *exc):
+        global _digest_depth
+        with _digest_lock:
+            _digest_depth -= 1
+            outermost = _digest_depth == 0
+        if outermost:
+            _get_digest().flush()
+        return False
+
 # ============================================================
 # 🧩 Basic Slack Alert (Used for new content notifications)
 # ============================================================
 
-def send_slack_alert(message: str):
+def send_slack_alert(message: str, topic: str = None):
     """
     Sends a simple text alert to the configured Slack channel.
+    In digest mode the alert is grouped under `topic` instead of posted right away.
     """
     if not SLACK_WEBHOOK_URL:
         print("❌ Slack webhook URL not found in environment.")
         return
 
-    payload = {"text": message}
-    response = requests.post(SLACK_WEBHOOK_URL, json=payload)
+    if _digest_active():
+        _get_digest().add(message, topic)
+        return
 
-    if response.status_code == 200:
-        print("✅ Sent Slack alert successfully.")
-    else:
-        print(f"❌ Failed to send Slack message: {response.text}")
+    payload = {"text": message}
+    _deliver(payload, "✅ Sent Slack alert successfully.", "❌ Failed to send Slack message")
 
 
 # ============================================================
@@ -63,13 +328,12 @@ def send_performance_alert(metrics: dict):
         f"• *Generated On:* {metrics.get('Date', '')}"
     )
 
-    payload = {"text": message}
-    response = requests.post(SLACK_WEBHOOK_URL, json=payload)
+    if _digest_active():
+        _get_digest().add(message, metrics.get('Topic'))
+        return
 
-    if response.status_code == 200:
-        print("✅ Sent Slack performance alert successfully.")
-    else:
-        print(f"❌ Failed to send performance Slack message: {response.text}")
+    payload = {"text": message}
+    _deliver(payload, "✅ Sent Slack performance alert successfully.", "❌ Failed to send performance Slack message")
 
 
 # ============================================================
@@ -85,23 +349,8 @@ def send_block_message(title: str, content: str):
         print("❌ Slack webhook URL not found.")
         return
 
-    payload = {
-        "blocks": [
-            {"type": "header", "text": {"type": "plain_text", "text": f"📢 {title}"}},
-            {
-                "type": "section",
-                "text": {"type": "mrkdwn", "text": content}
-            },
-            {"type": "divider"}
-        ]
-    }
-
-    response = requests.post(SLACK_WEBHOOK_URL, json=payload)
-
-    if response.status_code == 200:
-        print("✅ Sent block message successfully.")
-    else:
-        print(f"❌ Failed to send block message: {response.text}")
+    payload = _block_payload(title, [content])
+    _deliver(payload, "✅ Sent block message successfully.", "❌ Failed to send block message")
 
 
 # ============================================================
@@ -121,3 +370,4 @@ if __name__ == "__main__":
         "Date": "2025-11-11 15:45:00"
     }
     send_performance_alert(test_metrics)
+    flush_slack()
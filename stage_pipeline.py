@@ -0,0 +1,127 @@
+# ============================================================
+# 🏭 stage_pipeline.py — Concurrent Staged Pipeline
+# Handles:
+#   - A chain of stages, each with its own worker threads
+#   - Bounded queues between stages (a slow stage backs up its producers)
+#   - Per-item stages and micro-batched stages (e.g. batched sentiment)
+#   - Per-item failures recorded without stopping the rest of the batch
+# ============================================================
+
+import time
+import queue
+import threading
+
+_DONE = object()
+
+
+class Stage:
+    """
+    One pipeline step.
+    fn:         callable(item) that fills in fields of the item dict,
+                or callable(list of items) when batch_size > 1
+    workers:    number of threads running this stage
+    batch_size: items handed to fn at once (1 = one at a time)
+    """
+
+    def __init__(self, name, fn, workers=1, batch_size=1):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.stats = {"items": 0, "errors": 0, "busy_seconds": 0.0}
+        self._stats_lock = threading.Lock()
+
+    def _record(self, items, errors, seconds):
+        with self._stats_lock:
+            self.stats["items"] += items
+            self.stats["errors"] += errors
+            self.stats["busy_seconds"] += seconds
+
+
+class StagePipeline:
+    """
+    Runs items through stages in order. Each item is a dict; a stage that
+    raises marks the item with an "error" and the item skips the remaining stages.
+    """
+
+    def __init__(self, stages, queue_size=16):
+        self.stages = stages
+        self.queue_size = queue_size
+
+    def _take_batch(self, inbox, size):
+        """Block for one item, then take up to `size` without waiting. Returns (batch, done)."""
+        first = inbox.get()
+        if first is _DONE:
+            return [], True
+        batch = [first]
+        while len(batch) < size:
+            try:
+                item = inbox.get_nowait()
+            except queue.Empty:
+                break
+            if item is _DONE:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _work(self, stage, inbox, outbox):
+        done = False
+        while not done:
+            batch, done = self._take_batch(inbox, stage.batch_size)
+            ready = [item for item in batch if "error" not in item]
+            started = time.monotonic()
+            errors = 0
+            if ready:
+                try:
+                    if stage.batch_size > 1:
+                        stage.fn(ready)
+                    else:
+                        stage.fn(ready[0])
+                except Exception as e:
+                    errors = len(ready)
+                    for item in ready:
+                        item["error"] = f"{stage.name}: {e}"
+                    print(f"❌ Stage '{stage.name}' failed: {e}")
+            stage._record(len(ready), errors, time.monotonic() - started)
+            for item in batch:
+                outbox.put(item)
+        if done:
+            # Leave the sentinel for this stage's other workers
+            inbox.put(_DONE)
+
+    def run(self, items):
+        """Push every item through all stages; returns the items in completion order."""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages))]
+        results = queue.Queue()
+        outboxes = queues[1:] + [results]
+
+        threads = []
+        for stage, inbox, outbox in zip(self.stages, queues, outboxes):
+            group = [
+                threading.Thread(target=self._work, args=(stage, inbox, outbox),
+                                 name=f"stage-{stage.name}-{i}", daemon=True)
+                for i in range(stage.workers)
+            ]
+            for t in group:
+                t.start()
+            threads.append(group)
+
+        def feed():
+            for item in items:
+                queues[0].put(item)
+            queues[0].put(_DONE)
+
+        threading.Thread(target=feed, name="stage-feed", daemon=True).start()
+
+        # Once a stage's workers have all exited, close the next stage's inbox
+        for group, outbox in zip(threads, outboxes):
+            for t in group:
+                t.join()
+            if outbox is not results:
+                outbox.put(_DONE)
+
+        return [results.get() for _ in range(results.qsize())]
+
+    def report(self):
+        return {stage.name: dict(stage.stats, busy_seconds=round(stage.stats["busy_seconds"], 2))
+                for stage in self.stages}
@@ -0,0 +1,104 @@
+# ============================================================
+# 🕸️ step_dag.py — Declarative DAG Step Executor
+# Handles:
+#   - Declaring pipeline steps with the steps they depend on
+#   - Running every step as soon as its dependencies finish (threads)
+#   - A per-step timing trace, to compare against the critical path
+# ============================================================
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class StepDAG:
+    """
+    Small dependency graph of named steps:
+
+        dag = StepDAG()
+        dag.add("base", lambda: generate(topic))
+        dag.add("trends", fetch_trends)
+        dag.add("optimized", optimize, deps=("base", "trends"))
+        results = dag.run()
+
+    Each step is called with the results of its deps, in the order listed.
+    """
+
+    def __init__(self):
+        self.steps = {}     # name → (fn, deps), in declaration order
+        self.trace = []
+
+    def add(self, name, fn, deps=()):
+        for dep in deps:
+            if dep not in self.steps:
+                raise ValueError(f"Step '{name}' depends on unknown step '{dep}'")
+        self.steps[name] = (fn, tuple(deps))
+        return self
+
+    def run(self, max_workers=None, done=None, on_result=None):
+        """
+        Execute all steps; returns {step name: result}.
+        done: results already known (they are not re-run), e.g. from a checkpoint.
+        on_result: callable(name, result) invoked as each step succeeds.
+        If a step raises, no new steps are started and the error is re-raised
+        once the running ones finish.
+        """
+        results = dict(done or {})
+        pending = {name: spec for name, spec in self.steps.items() if name not in results}
+        running = {}
+        error = None
+        self.trace = []
+        origin = time.monotonic()
+
+        def timed(name, fn, args):
+            start = time.monotonic()
+            try:
+                return fn(*args)
+            finally:
+                end = time.monotonic()
+                self.trace.append({"step": name, "start": round(start - origin, 3),
+                                   "end": round(end - origin, 3), "seconds": round(end - start, 3)})
+
+        with ThreadPoolExecutor(max_workers=max_workers or max(1, len(pending))) as pool:
+            while pending or running:
+                if error is None:
+                    for name, (fn, deps) in list(pending.items()):
+                        if all(dep in results for dep in deps):
+                            del pending[name]
+                            args = [results[dep] for dep in deps]
+                            running[pool.submit(timed, name, fn, args)] = name
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        error = error or e
+                        continue
+                    if on_result is not None:
+                        on_result(name, results[name])
+
+        if error is not None:
+            raise error
+        return results
+
+    def critical_path_seconds(self):
+        """Longest dependency chain, measured from the trace of the last run."""
+        seconds = {entry["step"]: entry["seconds"] for entry in self.trace}
+        longest = {}
+        for name, (_, deps) in self.steps.items():
+            longest[name] = seconds.get(name, 0.0) + max((longest[d] for d in deps), default=0.0)
+        return round(max(longest.values(), default=0.0), 3)
+
+    def format_trace(self):
+        """One line per step: start → end offsets and duration."""
+        lines = [
+            f"   {e['step']:<12} {e['start']:>7.2f}s → {e['end']:>7.2f}s  ({e['seconds']:.2f}s)"
+            for e in sorted(self.trace, key=lambda e: e["start"])
+        ]
+        total = max((e["end"] for e in self.trace), default=0.0)
+        serial = sum(e["seconds"] for e in self.trace)
+        lines.append(f"   wall {total:.2f}s | serial sum {serial:.2f}s | "
+                     f"critical path {self.critical_path_seconds():.2f}s")
+        return "\n".join(lines)
@@ -1,16 +1,84 @@
 # trend_analysis.py
-import requests
 import os
+import time
+import threading
 
-def fetch_trending_topics():
-    """Fetch trending hashtags/topics from Twitter (X) using API."""
+# Trends change slowly: serve them from memory for TRENDS_TTL_SECONDS, refresh in the background
+TTL_SECONDS = float(os.getenv("TRENDS_TTL_SECONDS", "300"))
+TIMEOUT_SECONDS = float(os.getenv("TRENDS_TIMEOUT_SECONDS", "5"))
+# After a failed fetch, skip the API for this long instead of retrying on every call
+FAILURE_TTL_SECONDS = float(os.getenv("TRENDS_FAILURE_TTL_SECONDS", "30"))
+
+_snapshot = None        # (trends, fetched_at) of the last good response
+_failed_at = None       # monotonic time of the last failed fetch
+_refreshing = False
+_lock = threading.Lock()
+_refreshed = threading.Condition(_lock)
+
+
+def _request_trends():
+    """Call the Twitter (X) trends endpoint. Returns a list, or None on failure."""
     url = "https://api.twitter.com/2/trends/place.json?id=1"
     headers = {"Authorization": f"Bearer {os.getenv('TWITTER_BEARER_TOKEN')}"}
-    response = requests.get(url, headers=headers)
+    try:
+        import requests  # ~100 ms to import; only needed on a cache miss
+
+        response = requests.get(url, headers=headers, timeout=TIMEOUT_SECONDS)
+    except Exception as e:
+        print("Error fetching trends:", e)
+        return None
 
     if response.status_code == 200:
         trends = [t['name'] for t in response.json()[0]['trends'][:10]]
         return trends
     else:
         print("Error fetching trends:", response.text)
-        return []
+        return None
+
+
+def refresh_trends():
+    """Fetch trends now; a failure keeps the last good snapshot in place and is remembered for FAILURE_TTL_SECONDS."""
+    global _snapshot, _failed_at, _refreshing
+    trends = None
+    try:
+        trends = _request_trends()
+        return trends
+    finally:
+        with _lock:
+            if trends is not None:
+                _snapshot, _failed_at = (trends, time.monotonic()), None
+            else:
+                _failed_at = time.monotonic()
+            _refreshing = False
+            _refreshed.notify_all()
+
+
+def fetch_trending_topics():
+    """
+    Fetch trending hashtags/topics from Twitter (X) using API.
+    Fresh results come from memory; stale ones are returned immediately while
+    a background thread refreshes them. Falls back to the last good snapshot
+    (or an empty list) when the API is unreachable; after a failure the API
+    is not retried for FAILURE_TTL_SECONDS.
+    """
+    global _refreshing
+    with _lock:
+        now = time.monotonic()
+        recently_failed = _failed_at is not None and now - _failed_at < FAILURE_TTL_SECONDS
+        snapshot = _snapshot
+        if snapshot is not None:
+            trends, fetched_at = snapshot
+            if now - fetched_at >= TTL_SECONDS and not _refreshing and not recently_failed:
+                _refreshing = True
+                threading.Thread(target=refresh_trends, name="trends-refresh", daemon=True).start()
+            return list(trends)
+        if recently_failed:
+            return []
+        # Nothing cached yet: only one caller fetches, the rest wait for it
+        first = not _refreshing
+        if not first:
+            _refreshed.wait_for(lambda: not _refreshing)
+            return list(_snapshot[0]) if _snapshot else []
+        _refreshing = True
+
+    return list(refresh_trends() or [])